@@ -0,0 +1,340 @@
+"""Параллельный запуск всех проверок репозитория.
+
+python run_tests.py [--jobs N] [--project ya_news] [-- аргументы pytest]
+
+flake8, structure_test.py и тесты ya_news и ya_note запускаются
+одновременно. Тесты каждого проекта делятся на --jobs шардов
+(по умолчанию по числу ядер), каждый шард — отдельный процесс pytest
+со своей базой SQLite. База шарда — копия шаблона, в который миграции
+применены один раз; шаблон пересоздаётся, только когда меняются
+миграции проекта.
+
+Время и исход каждого теста запоминаются в .test_runs/: следующий
+запуск раскладывает тесты по шардам с учётом их времени и начинает
+с упавших в прошлый раз. Для этого модуль подключается к pytest
+шардов как плагин (-p run_tests).
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter, sleep
+
+ROOT = Path(__file__).resolve().parent
+RUNS_DIR = ROOT / '.test_runs'
+HISTORY_FILE = RUNS_DIR / 'history.json'
+PROJECTS = ('ya_news', 'ya_note')
+# Время теста, который ещё ни разу не запускался, с.
+DEFAULT_DURATION = 0.1
+POLL_INTERVAL = 0.02
+
+
+@dataclass
+class Job:
+    """Процесс проверки и его итоги."""
+
+    name: str
+    command: list
+    cwd: Path
+    env: dict = field(default_factory=dict)
+    report: Path = None
+    process: subprocess.Popen = None
+    started: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def log(self):
+        name = self.name.replace(' ', '-').replace('/', '-')
+        return RUNS_DIR / f'{name}.log'
+
+    def start(self):
+        self.started = perf_counter()
+        with open(self.log, 'wb') as log:
+            self.process = subprocess.Popen(
+                self.command, cwd=self.cwd, stdout=log,
+                stderr=subprocess.STDOUT, env={**os.environ, **self.env},
+            )
+
+    def poll(self):
+        """Завершился ли процесс; время фиксируется при первой проверке."""
+        if self.elapsed:
+            return True
+        if self.process.poll() is None:
+            return False
+        self.elapsed = perf_counter() - self.started
+        return True
+
+    @property
+    def failed(self):
+        return self.process.returncode != 0
+
+
+def wait(jobs):
+    """Ждёт завершения всех задач, засекая время каждой."""
+    running = list(jobs)
+    while running:
+        running = [job for job in running if not job.poll()]
+        if running:
+            sleep(POLL_INTERVAL)
+    return jobs
+
+
+def load_history():
+    try:
+        return json.loads(HISTORY_FILE.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+
+
+def migrations_digest(project_dir):
+    digest = hashlib.sha1()
+    for path in sorted(project_dir.glob('*/migrations/*.py')):
+        digest.update(str(path.relative_to(project_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def template_job(project):
+    """Задача создания шаблона базы или None, если он уже есть."""
+    project_dir = ROOT / project
+    template = RUNS_DIR / f'{project}-{migrations_digest(project_dir)}.db'
+    if template.exists():
+        return template, None
+    for stale in RUNS_DIR.glob(f'{project}-*.db'):
+        stale.unlink()
+    return template, Job(
+        f'{project} шаблон',
+        [sys.executable, str(Path(__file__)), '--make-template',
+         str(template)],
+        project_dir,
+    )
+
+
+def make_template(path):
+    """Применяет миграции к новой базе path (запускается в проекте)."""
+    sys.path.insert(0, os.getcwd())
+    import configparser
+
+    config = configparser.ConfigParser()
+    config.read('pytest.ini')
+    os.environ.setdefault(
+        'DJANGO_SETTINGS_MODULE', config['pytest']['DJANGO_SETTINGS_MODULE']
+    )
+    import django
+    from django.db import connection
+
+    django.setup()
+    building = f'{path}.tmp'
+    if os.path.exists(building):
+        os.remove(building)
+    connection.settings_dict['TEST']['NAME'] = building
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    connection.close()
+    os.replace(building, path)
+
+
+def collect_job(project, pytest_args):
+    return Job(
+        f'{project} сбор',
+        # -vv из pytest.ini: только при итоговом -1 выводятся node id.
+        [sys.executable, '-m', 'pytest', '--collect-only', '-qqq',
+         *pytest_args],
+        ROOT / project,
+    )
+
+
+def collected_tests(job):
+    lines = job.log.read_text(encoding='utf-8').splitlines()
+    return [line for line in lines if '::' in line]
+
+
+def split(tests, jobs, history):
+    """Раскладывает тесты по шардам с примерно равным временем.
+
+    Самые долгие тесты распределяются первыми, каждый — в наименее
+    загруженный шард. Внутри шарда первыми идут упавшие в прошлый
+    раз, остальные — в порядке сбора, чтобы тесты одного класса
+    оставались рядом.
+    """
+    def duration(test):
+        return history.get(test, {}).get('duration', DEFAULT_DURATION)
+
+    order = {test: index for index, test in enumerate(tests)}
+    shards = [[] for _ in range(jobs)]
+    loads = [0.0] * jobs
+    for test in sorted(tests, key=duration, reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(test)
+        loads[index] += duration(test)
+    return [
+        sorted(shard, key=lambda test: (
+            not history.get(test, {}).get('failed', False), order[test]
+        ))
+        for shard in shards if shard
+    ]
+
+
+def shard_jobs(project, template, shards, pytest_args):
+    jobs = []
+    for index, tests in enumerate(shards, start=1):
+        database = RUNS_DIR / f'{project}-shard-{index}.sqlite3'
+        shutil.copyfile(template, database)
+        report = RUNS_DIR / f'{project}-shard-{index}.json'
+        if report.exists():
+            report.unlink()
+        job = Job(
+            f'{project} {index}/{len(shards)}',
+            [sys.executable, '-m', 'pytest', '-p', 'run_tests',
+             '--reuse-db', *pytest_args, *tests],
+            ROOT / project,
+            env={
+                'TEST_DB_NAME': str(database),
+                'TEST_REPORT': str(report),
+                'PYTHONPATH': os.pathsep.join(
+                    filter(None, (str(ROOT), os.environ.get('PYTHONPATH')))
+                ),
+            },
+            report=report,
+        )
+        jobs.append(job)
+    return jobs
+
+
+def update_history(history, jobs):
+    for job in jobs:
+        if job.report is None or not job.report.exists():
+            continue
+        history.update(json.loads(job.report.read_text(encoding='utf-8')))
+    HISTORY_FILE.write_text(
+        json.dumps(history, ensure_ascii=False, indent=1), encoding='utf-8'
+    )
+
+
+def print_report(jobs, wall):
+    print(f'{"задача":<20} {"тестов":>7} {"упало":>6} {"сек":>7}')
+    totals = {'tests': 0, 'failed': 0}
+    for job in jobs:
+        tests = failed = '-'
+        if job.report is not None and job.report.exists():
+            results = json.loads(job.report.read_text(encoding='utf-8'))
+            tests = len(results)
+            failed = sum(result['failed'] for result in results.values())
+            totals['tests'] += tests
+            totals['failed'] += failed
+        print(f'{job.name:<20} {tests:>7} {failed:>6} {job.elapsed:>7.2f}')
+    busy = sum(job.elapsed for job in jobs)
+    print(
+        f'Итого: тестов {totals["tests"]}, упало {totals["failed"]}; '
+        f'по часам {wall:.2f} с, сумма времени задач {busy:.2f} с'
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--project', choices=PROJECTS, action='append', dest='projects'
+    )
+    parser.add_argument('--make-template', help=argparse.SUPPRESS)
+    parser.add_argument('pytest_args', nargs='*')
+    return parser.parse_args()
+
+
+def preparation_jobs(projects, jobs, pytest_args):
+    """Шаблоны баз и сбор списков тестов для проектов.
+
+    Возвращает словари шаблонов и задач сбора и список всех задач.
+    """
+    templates = {}
+    collectors = {}
+    prepared = []
+    for project in projects:
+        templates[project], template = template_job(project)
+        if template is not None:
+            prepared.append(template)
+        # Один шард запускает весь проект, сбор списка тестов не нужен.
+        if jobs > 1:
+            collectors[project] = collect_job(project, pytest_args)
+            prepared.append(collectors[project])
+    return templates, collectors, prepared
+
+
+def all_shard_jobs(projects, templates, collectors, args):
+    history = load_history()
+    jobs = []
+    for project in projects:
+        shards = [[]]
+        if project in collectors:
+            shards = split(
+                collected_tests(collectors[project]), args.jobs, history
+            )
+        jobs += shard_jobs(
+            project, templates[project], shards, args.pytest_args
+        )
+    return history, jobs
+
+
+def main():
+    args = parse_args()
+    if args.make_template:
+        make_template(args.make_template)
+        return 0
+    projects = args.projects or PROJECTS
+    RUNS_DIR.mkdir(exist_ok=True)
+    started = perf_counter()
+    checks = [
+        Job('flake8', [sys.executable, '-m', 'flake8', '--config=setup.cfg'],
+            ROOT),
+        Job('structure_test', [sys.executable, 'structure_test.py'], ROOT),
+    ]
+    templates, collectors, prepared = preparation_jobs(
+        projects, args.jobs, args.pytest_args
+    )
+    for job in checks + prepared:
+        job.start()
+    wait(prepared)
+    shards = []
+    if not any(job.failed for job in prepared):
+        history, shards = all_shard_jobs(
+            projects, templates, collectors, args
+        )
+        for job in shards:
+            job.start()
+    jobs = wait(checks + prepared + shards)
+    wall = perf_counter() - started
+    if shards:
+        update_history(history, shards)
+    for job in jobs:
+        if job.failed:
+            print(f'===== {job.name} =====')
+            print(job.log.read_text(encoding='utf-8'))
+    print_report(jobs, wall)
+    return 1 if any(job.failed for job in jobs) else 0
+
+
+# Плагин pytest для шардов: время и исход каждого теста в TEST_REPORT.
+_results = {}
+
+
+def pytest_runtest_logreport(report):
+    result = _results.setdefault(
+        report.nodeid, {'duration': 0.0, 'failed': False}
+    )
+    result['duration'] += report.duration
+    result['failed'] = result['failed'] or report.failed
+
+
+def pytest_sessionfinish(session):
+    path = os.environ.get('TEST_REPORT')
+    if path:
+        with open(path, 'w', encoding='utf-8') as report:
+            json.dump(_results, report, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
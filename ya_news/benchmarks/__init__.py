@@ -0,0 +1,12 @@
+"""Бенчмарки проекта YaNews.
+
+Запускаются из директории ya_news: python -m benchmarks.<имя>.
+"""
+import os
+
+
+def setup_django(settings_module='yanews.settings'):
+    """Настраивает Django для скриптов, запущенных вне manage.py."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
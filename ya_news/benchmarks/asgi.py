@@ -0,0 +1,213 @@
+"""Пропускная способность WSGI и ASGI при медленных клиентах.
+
+python -m benchmarks.asgi --scale 0.01 [--connections 500]
+    [--requests 2000] [--threads 8] [--client-delay 0.1] [--keepdb]
+
+Оба режима работают в одном процессе, без сети. Клиенты открывают
+--connections одновременных соединений и отправляют тело запроса
+за --client-delay секунд.
+
+- wsgi: синхронные представления в пуле из --threads потоков, как
+  у gunicorn с gthread. Медленный клиент занимает поток всё время
+  отправки.
+- asgi: асинхронные представления (NEWS_ASYNC_VIEWS) на одном
+  цикле событий, как у одного воркера uvicorn. Ожидание клиента
+  не занимает поток, а ORM работает в пуле NEWS_ASYNC_DB_WORKERS.
+
+Запросы делятся поровну между главной и страницами новостей.
+"""
+import argparse
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from time import perf_counter, sleep
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks import setup_django
+
+PROJECT = 'ya_news'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=0.01)
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--client-delay', type=float, default=0.1)
+    parser.add_argument('--db', default='benchmarks/bench.sqlite3')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', default=None)
+    return parser.parse_args()
+
+
+def build_paths(requests, rng):
+    from django.urls import reverse
+
+    from news.models import News
+
+    news_ids = list(News.objects.values_list('pk', flat=True)[:1000])
+    home = reverse('news:home')
+    return [
+        home if index % 2 else reverse(
+            'news:detail', args=(rng.choice(news_ids),)
+        )
+        for index in range(requests)
+    ]
+
+
+async def drive(paths, connections, serve):
+    """Замкнутый цикл: каждое соединение шлёт запросы один за другим.
+
+    Задержка считается от отправки запроса клиентом, то есть включает
+    ожидание свободного потока сервера.
+    """
+    pending = iter(paths)
+    results = []
+
+    async def client():
+        for path in pending:
+            started = perf_counter()
+            status = await serve(path)
+            results.append((status, perf_counter() - started))
+
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return results
+
+
+def run_wsgi(paths, args):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(path):
+        # Пока медленный клиент передаёт запрос, поток сервера занят.
+        sleep(args.client_delay)
+        environ = {'PATH_INFO': path, 'HTTP_HOST': 'testserver'}
+        setup_testing_defaults(environ)
+        environ['wsgi.input'] = BytesIO()
+        statuses = []
+        body = handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b''.join(body)
+        body.close()
+        return statuses[0]
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            return await drive(
+                paths, args.connections,
+                lambda path: loop.run_in_executor(pool, request, path),
+            )
+
+    return asyncio.run(main())
+
+
+def run_asgi(paths, args):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+
+    async def receive():
+        await asyncio.sleep(args.client_delay)
+        return {'type': 'http.request', 'body': b''}
+
+    async def request(path):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await handler({
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+        }, receive, send)
+        return str(messages[0]['status'])
+
+    return asyncio.run(drive(paths, args.connections, request))
+
+
+def summarize(results, elapsed):
+    from yacommon.harness import PERCENTILES, percentile
+
+    errors = [status for status, _ in results if not status.startswith('2')]
+    if errors:
+        raise RuntimeError(f'Ошибочные ответы: {sorted(set(errors))}')
+    latencies = [latency * 1000 for _, latency in results]
+    summary = {
+        'requests': len(results),
+        'seconds': elapsed,
+        'rps': len(results) / elapsed,
+    }
+    for percent in PERCENTILES:
+        summary[f'p{percent}_ms'] = percentile(latencies, percent)
+    return summary
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+
+    from benchmarks import data
+    from yacommon import harness
+
+    setup_test_environment()
+    connection.settings_dict['TEST']['NAME'] = args.db
+    old_name = connection.creation.create_test_db(
+        verbosity=0, keepdb=args.keepdb, serialize=False
+    )
+    try:
+        sizes = data.seed(args.scale)
+        paths = build_paths(args.requests, random.Random(42))
+        modes = {}
+        for mode, run, urlconf in (
+            ('wsgi', run_wsgi, 'yanews.urls'),
+            ('asgi', run_asgi, 'yanews.urls_async'),
+        ):
+            with override_settings(ROOT_URLCONF=urlconf):
+                started = perf_counter()
+                results = run(paths, args)
+                modes[mode] = summarize(results, perf_counter() - started)
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=args.keepdb
+        )
+    results = {
+        'project': PROJECT,
+        'commit': harness.current_commit(),
+        'scale': args.scale,
+        'sizes': sizes,
+        'connections': args.connections,
+        'threads': args.threads,
+        'client_delay': args.client_delay,
+        'modes': modes,
+    }
+    output = args.output or (
+        f'benchmarks/results/{PROJECT}-asgi-'
+        f'{results["commit"] or "local"}.json'
+    )
+    harness.write_results(output, results)
+    print(f'{"режим":<6} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8}')
+    for mode, summary in modes.items():
+        print(
+            f'{mode:<6} {summary["rps"]:>8.1f} {summary["p50_ms"]:>8.1f} '
+            f'{summary["p95_ms"]:>8.1f} {summary["p99_ms"]:>8.1f}'
+        )
+    print(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""Поток комментариев: запись в запросе против очереди news.comment_queue.
+
+python -m benchmarks.comment_queue [--workers 8] [--seconds 5]
+    [--level view|http]
+
+Каждый процесс в цикле отправляет комментарии в базу SQLite
+(по умолчанию боевого профиля). На уровне view вызывается само
+представление NewsComment (форма, проверка слов, запись, адрес
+редиректа), на уровне http — ещё и весь стек middleware через
+тестовый клиент. В режиме queue
+процессы работают с NEWS_COMMENT_QUEUE и своими фоновыми потоками
+разбора; после окончания замеряется, за сколько сохраняется остаток.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+from time import perf_counter
+
+from benchmarks import setup_django
+
+MODES = ('sync', 'queue')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--level', choices=('view', 'http'), default='view')
+    parser.add_argument(
+        '--settings', default='yanews.settings_production',
+        help='Профиль настроек: от него зависят PRAGMA и режим транзакций.',
+    )
+    return parser.parse_args()
+
+
+def make_poster(level, user_pk, url):
+    from django.contrib.auth import get_user_model
+    from django.test import Client, RequestFactory
+    from django.urls import resolve
+
+    from news.views import NewsComment
+
+    user = get_user_model().objects.get(pk=user_pk)
+    data = {'text': 'Срочно!'}
+    if level == 'http':
+        client = Client()
+        client.force_login(user)
+        return lambda: client.post(url, data=data)
+    factory = RequestFactory()
+    view = NewsComment.as_view()
+    kwargs = resolve(url).kwargs
+
+    def post():
+        request = factory.post(url, data=data)
+        request.user = user
+        return view(request, **kwargs)
+
+    return post
+
+
+def worker(mode, level, queue_dir, seconds, user_pk, url, results):
+    from django.test.utils import override_settings
+
+    from news.comment_queue import comment_queue
+
+    post = make_poster(level, user_pk, url)
+    done = errors = 0
+    with override_settings(
+        NEWS_COMMENT_QUEUE=mode == 'queue', NEWS_COMMENT_QUEUE_DIR=queue_dir
+    ):
+        deadline = perf_counter() + seconds
+        while perf_counter() < deadline:
+            try:
+                response = post()
+            except Exception:
+                errors += 1
+                continue
+            if response.status_code == 302:
+                done += 1
+            else:
+                errors += 1
+        if mode == 'queue':
+            comment_queue.stop()
+    results.put((done, errors))
+
+
+def run(mode, args, queue_dir, user_pk, url):
+    from django.db import connections
+    from django.test.utils import override_settings
+
+    from news.comment_queue import comment_queue
+    from news.models import Comment
+
+    before = Comment.objects.count()
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                mode, args.level, queue_dir, args.seconds, user_pk, url,
+                results,
+            ),
+        )
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    counts = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    started = perf_counter()
+    # Остаток очереди, который не успели разобрать потоки процессов.
+    with override_settings(NEWS_COMMENT_QUEUE_DIR=queue_dir):
+        comment_queue.flush()
+    drain = perf_counter() - started
+    done = sum(done for done, _ in counts)
+    saved = Comment.objects.count() - before
+    return {
+        'accepted': done,
+        'errors': sum(errors for _, errors in counts),
+        'saved': saved,
+        'per_second': done / args.seconds,
+        'drain_ms': drain * 1000,
+    }
+
+
+def main():
+    args = parse_args()
+    setup_django(args.settings)
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    from news.models import News
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'bench.sqlite3'
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, serialize=False
+        )
+        try:
+            user = get_user_model().objects.create(username='bench')
+            news = News.objects.create(title='Срочно', text='Новость')
+            url = reverse('news:detail', args=(news.pk,))
+            print(f'{"режим":<6} {"принято/с":>10} {"ошибок":>7} '
+                  f'{"сохранено":>10} {"дозапись мс":>12}')
+            for mode in MODES:
+                result = run(
+                    mode, args, os.path.join(directory, 'queue'),
+                    user.pk, url,
+                )
+                print(
+                    f'{mode:<6} {result["per_second"]:>10.0f} '
+                    f'{result["errors"]:>7} {result["saved"]:>10} '
+                    f'{result["drain_ms"]:>12.0f}'
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
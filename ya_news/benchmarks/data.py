@@ -0,0 +1,86 @@
+"""Генерация больших наборов данных для нагрузочных сценариев YaNews."""
+import random
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from benchmarks.profanity import random_word
+from news.models import Comment, News, make_excerpt
+
+# Размеры при scale=1.
+SIZES = {'users': 10_000, 'news': 100_000, 'comments': 1_000_000}
+# Доля комментариев, приходящихся на самые свежие новости.
+HOT_SHARE = 0.2
+HOT_NEWS = 10
+BATCH_SIZE = 5_000
+
+
+def scaled_sizes(scale):
+    return {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+
+
+def batches(objects, size=BATCH_SIZE):
+    iterator = iter(objects)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def sentence(rng, words):
+    return ' '.join(random_word(rng) for _ in range(words))
+
+
+def seed(scale, rng_seed=42, stdout=print):
+    """Заполняет базу; повторный вызов на заполненной базе ничего не делает."""
+    sizes = scaled_sizes(scale)
+    if News.objects.count() >= sizes['news']:
+        stdout(f'Данные уже созданы: {sizes}')
+        return sizes
+    rng = random.Random(rng_seed)
+    User = get_user_model()
+    for batch in batches(
+        User(username=f'bench-{index}') for index in range(sizes['users'])
+    ):
+        User.objects.bulk_create(batch)
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    today = date.today()
+
+    def make_news(index):
+        title = sentence(rng, 3)[:50]
+        text = sentence(rng, 80)
+        # bulk_create не вызывает save(), анонс заполняется здесь.
+        return News(
+            title=title,
+            text=text,
+            excerpt=make_excerpt(text),
+            date=today - timedelta(days=index // 10),
+        )
+
+    for batch in batches(make_news(index) for index in range(sizes['news'])):
+        News.objects.bulk_create(batch)
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    hot_ids = list(
+        News.objects.values_list('pk', flat=True)[:HOT_NEWS]
+    )
+
+    def pick_news():
+        if rng.random() < HOT_SHARE:
+            return rng.choice(hot_ids)
+        return rng.choice(news_ids)
+
+    for batch in batches(
+        Comment(
+            news_id=pick_news(),
+            author_id=rng.choice(user_ids),
+            text=sentence(rng, rng.randint(3, 40)),
+        )
+        for _ in range(sizes['comments'])
+    ):
+        Comment.objects.bulk_create(batch)
+    call_command('recount_comments', verbosity=0)
+    stdout(f'Создано: {sizes}')
+    return sizes
@@ -0,0 +1,113 @@
+"""Нагрузочные сценарии YaNews через тестовый клиент Django.
+
+python -m benchmarks.load --scale 0.01 --requests 200 [--keepdb]
+    [--compare benchmarks/results/ya_news-<commit>.json]
+
+При --scale 1 создаётся 100k новостей и 1M комментариев от 10k
+пользователей. Данные пишутся в отдельную базу (--db), а не в
+рабочую; с --keepdb она переиспользуется между запусками.
+Результаты сохраняются в JSON для сравнения между коммитами.
+"""
+import argparse
+import random
+
+from benchmarks import setup_django
+
+PROJECT = 'ya_news'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=0.01)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--db', default='benchmarks/bench.sqlite3')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Отключить кэш фрагментов (DummyCache).',
+    )
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--compare', default=None)
+    return parser.parse_args()
+
+
+def build_scenarios(rng):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    from news.models import News
+
+    anonymous = Client()
+    author = Client()
+    author.force_login(get_user_model().objects.order_by('?').first())
+    home_url = reverse('news:home')
+    hottest = News.objects.order_by('-comment_count').first()
+    hot_url = reverse('news:detail', args=(hottest.pk,))
+    news_ids = list(News.objects.values_list('pk', flat=True)[:1000])
+
+    def random_detail_url():
+        return reverse('news:detail', args=(rng.choice(news_ids),))
+
+    return {
+        'home': lambda: anonymous.get(home_url),
+        'detail_hot': lambda: anonymous.get(hot_url),
+        'detail': lambda: anonymous.get(random_detail_url()),
+        'comment_post': lambda: author.post(
+            random_detail_url(), data={'text': 'Комментарий под нагрузкой'}
+        ),
+    }
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from django.db import connection
+    from django.test.utils import (
+        override_settings, setup_test_environment,
+    )
+
+    from benchmarks import data
+    from yacommon import harness
+
+    setup_test_environment()
+    connection.settings_dict['TEST']['NAME'] = args.db
+    old_name = connection.creation.create_test_db(
+        verbosity=0, keepdb=args.keepdb, serialize=False
+    )
+    caches = None
+    if args.no_cache:
+        caches = {'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }}
+    try:
+        sizes = data.seed(args.scale)
+        rng = random.Random(42)
+        with override_settings(**({'CACHES': caches} if caches else {})):
+            scenarios = build_scenarios(rng)
+            results = {
+                'project': PROJECT,
+                'commit': harness.current_commit(),
+                'scale': args.scale,
+                'sizes': sizes,
+                'cache': not args.no_cache,
+                'scenarios': {
+                    name: harness.run_scenario(scenario, args.requests)
+                    for name, scenario in scenarios.items()
+                },
+            }
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=args.keepdb
+        )
+    output = args.output or (
+        f'benchmarks/results/{PROJECT}-{results["commit"] or "local"}.json'
+    )
+    harness.write_results(output, results)
+    baseline = harness.load_results(args.compare) if args.compare else None
+    harness.print_results(results, baseline)
+    print(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Сравнение автомата Ахо — Корасик с линейным перебором BAD_WORDS.
+
+python -m benchmarks.profanity [--repeat 20]
+"""
+import argparse
+import random
+import timeit
+
+from benchmarks import setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+SIZES = (10, 1_000, 10_000)
+
+
+def random_word(rng, min_length=4, max_length=10):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def make_comment(rng, words_count=300):
+    """Длинный «чистый» комментарий — худший случай для перебора."""
+    return ' '.join(random_word(rng, 2, 8) for _ in range(words_count))
+
+
+def linear_search(words, text):
+    """Прежняя реализация CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    from news.profanity import Matcher
+
+    rng = random.Random(42)
+    text = make_comment(rng)
+    print(f'Текст: {len(text)} символов, повторов: {args.repeat}')
+    print(f'{"слов":>8} {"перебор, мс":>14} {"автомат, мс":>14} '
+          f'{"сборка, мс":>12}')
+    for size in SIZES:
+        words = [random_word(rng) for _ in range(size)]
+        build = timeit.timeit(lambda: Matcher(words), number=1)
+        matcher = Matcher(words)
+        assert bool(matcher.search(text)) == linear_search(words, text)
+        linear = timeit.timeit(
+            lambda: linear_search(words, text), number=args.repeat
+        )
+        automaton = timeit.timeit(
+            lambda: matcher.search(text), number=args.repeat
+        )
+        print(f'{size:>8} {linear / args.repeat * 1000:>14.3f} '
+              f'{automaton / args.repeat * 1000:>14.3f} '
+              f'{build * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Конкурентная запись комментариев в SQLite: обычный и боевой профиль.
+
+python -m benchmarks.sqlite_writes [--workers 8] [--seconds 5]
+
+Каждый процесс повторяет транзакцию NewsComment.form_valid (чтение
+новости, INSERT комментария, UPDATE счётчика). Обычный профиль
+открывает соединение на каждый запрос и работает с настройками SQLite
+по умолчанию; боевой — держит соединение, применяет SQLITE_PRAGMAS
+из yanews.settings_production и открывает транзакции BEGIN IMMEDIATE,
+как бэкенд yacommon.db_backend.
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+from time import perf_counter
+
+from yanews import settings_production
+
+SCHEMA = (
+    'CREATE TABLE news (id INTEGER PRIMARY KEY, comment_count INTEGER)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, news_id INTEGER, '
+    'text TEXT, created TEXT)',
+    'CREATE INDEX comment_news ON comment (news_id, created, id)',
+    'INSERT INTO news (id, comment_count) VALUES (1, 0)',
+)
+PROFILES = {
+    'default': {'persistent': False, 'pragmas': {}, 'begin': 'BEGIN'},
+    'production': {
+        'persistent': True,
+        'pragmas': settings_production.SQLITE_PRAGMAS,
+        'begin': 'BEGIN IMMEDIATE',
+    },
+}
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, isolation_level=None)
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+    return connection
+
+
+def post_comment(connection, begin):
+    connection.execute(begin)
+    try:
+        connection.execute('SELECT id FROM news WHERE id = 1').fetchone()
+        connection.execute(
+            "INSERT INTO comment (news_id, text, created) "
+            "VALUES (1, 'Комментарий', datetime('now'))"
+        )
+        connection.execute(
+            'UPDATE news SET comment_count = comment_count + 1 WHERE id = 1'
+        )
+        connection.execute('COMMIT')
+    except sqlite3.OperationalError:
+        connection.execute('ROLLBACK')
+        raise
+
+
+def worker(path, profile, seconds, results):
+    settings = PROFILES[profile]
+    done = errors = 0
+    connection = None
+    deadline = perf_counter() + seconds
+    while perf_counter() < deadline:
+        if connection is None:
+            connection = connect(path, settings['pragmas'])
+        try:
+            post_comment(connection, settings['begin'])
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+        if not settings['persistent']:
+            connection.close()
+            connection = None
+    results.put((done, errors))
+
+
+def run(profile, workers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        connection = connect(path, PROFILES[profile]['pragmas'])
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.close()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=worker, args=(path, profile, seconds, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    done = sum(total[0] for total in totals)
+    errors = sum(total[1] for total in totals)
+    return done / seconds, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    print(f'Процессов: {args.workers}, секунд: {args.seconds:g}')
+    print(f'{"профиль":<12} {"записей/с":>10} {"locked":>8}')
+    for profile in PROFILES:
+        throughput, errors = run(profile, args.workers, args.seconds)
+        print(f'{profile:<12} {throughput:>10.0f} {errors:>8}')
+
+
+if __name__ == '__main__':
+    main()
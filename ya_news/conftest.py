@@ -1,11 +1,31 @@
-from datetime import datetime, timedelta
+import os
+from datetime import timedelta
 
 import pytest
-from django.utils import timezone
+from django.core.cache import cache
+from django.db import connections
 from news.models import Comment, News
+from news.pytest_tests.factories import (
+    LARGE_THREAD_SIZE, make_comments, make_news, make_users, shared_dataset,
+)
 from yanews import settings
 
 
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix
+):
+    """Своя база шарда при запуске через run_tests.py."""
+    name = os.environ.get('TEST_DB_NAME')
+    if name:
+        connections['default'].settings_dict['TEST']['NAME'] = name
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username='Автор')
@@ -33,14 +53,9 @@ def pk_news(news):
 
 @pytest.fixture
 def news_list():
-    today = datetime.today()
-    News.objects.bulk_create(
-        News(title=f'Новость {index}',
-             text='Просто текст.',
-             date=today - timedelta(days=index))
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+    return make_news(
+        settings.NEWS_COUNT_ON_HOME_PAGE + 1, text='Просто текст.'
     )
-    return news_list
 
 
 @pytest.fixture
@@ -55,16 +70,22 @@ def comment(author, news):
 
 @pytest.fixture
 def comments_list(news, author):
-    now = timezone.now()
-    comments_list = []
-    for index in range(11):
-        comment = Comment.objects.create(
-            news=news, author=author, text=f'Tекст {index}',
+    return make_comments(
+        news, [author], 11, step=timedelta(days=1), text='Tекст {index}'
+    )
+
+
+@pytest.fixture(scope='module')
+def large_thread(django_db_setup, django_db_blocker):
+    """Новость с LARGE_THREAD_SIZE комментариями, общая для модуля."""
+    def build():
+        news, = make_news(1, index=False)
+        make_comments(
+            news, make_users(10), LARGE_THREAD_SIZE, index=False
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
-        comments_list.append(comment)
-    return comments_list
+        return news
+
+    yield from shared_dataset(django_db_blocker, build)
 
 
 @pytest.fixture
@@ -72,3 +93,8 @@ def form_data():
     return {
         'text': 'Новый текст коментария'
     }
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ROOT_URLCONF = 'yanews.urls_async'
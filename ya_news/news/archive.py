@@ -0,0 +1,143 @@
+"""Архив старых новостей.
+
+Новости старше NEWS_ARCHIVE_AFTER_DAYS вместе с комментариями
+переносятся пачками в таблицы ArchivedNews и ArchivedComment с теми же
+первичными ключами. Рабочие таблицы и их индексы остаются маленькими,
+а страница новости по прежнему адресу находит её в архиве.
+
+Каждая пачка переносится в своей транзакции: прерванный перенос
+ничего не теряет, и его достаточно запустить снова. Архивные новости
+не ищутся и не принимают новых комментариев.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import Http404
+from django.utils import timezone
+
+from . import search
+from .cache import invalidate_home
+from .models import ArchivedComment, ArchivedNews, Comment, News
+
+# Откуда и куда переносятся строки и по какому столбцу они отбираются.
+MOVES = (
+    (News, ArchivedNews, 'id'),
+    (Comment, ArchivedComment, 'news_id'),
+)
+
+
+def archive_cutoff(days=None):
+    """Новости с датой раньше этой считаются старыми."""
+    if days is None:
+        days = settings.NEWS_ARCHIVE_AFTER_DAYS
+    return timezone.localdate() - timedelta(days=days)
+
+
+def get_news_or_404(pk):
+    """Новость из рабочей таблицы, а если её там нет, — из архива."""
+    try:
+        return News.objects.get(pk=pk)
+    except News.DoesNotExist:
+        pass
+    try:
+        return ArchivedNews.objects.get(pk=pk)
+    except ArchivedNews.DoesNotExist:
+        raise Http404('Новость не найдена.')
+
+
+def news_revision(pk):
+    """Номер изменения новости pk без загрузки самой новости.
+
+    None — новости нет ни в рабочей таблице, ни в архиве.
+    """
+    for model in (News, ArchivedNews):
+        revision = model.objects.filter(pk=pk).values_list(
+            'revision', flat=True
+        ).first()
+        if revision is not None:
+            return revision
+    return None
+
+
+def comment_model(news):
+    return ArchivedComment if news.archived else Comment
+
+
+def copy_rows(cursor, source, target, column, subquery):
+    """INSERT ... SELECT строк source, у которых column из пачки.
+
+    subquery — SQL и параметры подзапроса с id новостей пачки: число
+    параметров не растёт с размером пачки, и лимит SQLite
+    в 999 переменных ей не мешает. Столбцы архивной модели —
+    подмножество столбцов рабочей.
+    """
+    sql, params = subquery
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(field.column) for field in target._meta.concrete_fields
+    )
+    cursor.execute(
+        f'INSERT INTO {quote(target._meta.db_table)} ({columns}) '
+        f'SELECT {columns} FROM {quote(source._meta.db_table)} '
+        f'WHERE {quote(column)} IN ({sql})',
+        params,
+    )
+
+
+def delete_rows(cursor, model, column, subquery):
+    sql, params = subquery
+    quote = connection.ops.quote_name
+    cursor.execute(
+        f'DELETE FROM {quote(model._meta.db_table)} '
+        f'WHERE {quote(column)} IN ({sql})',
+        params,
+    )
+    return cursor.rowcount
+
+
+def archive_batch(before, batch_size):
+    """Переносит в архив до batch_size самых старых новостей до before.
+
+    Возвращает число перенесённых новостей и комментариев. Строки
+    копируются и удаляются SQL-запросами, без сигналов: документы
+    поискового индекса удаляются здесь же одним вызовом.
+    """
+    with transaction.atomic():
+        batch = News.objects.filter(date__lt=before).order_by(
+            'date', 'id'
+        ).values('pk')[:batch_size]
+        news_ids = [row['pk'] for row in batch]
+        if not news_ids:
+            return 0, 0
+        documents = [search.Document(pk) for pk in news_ids] + [
+            search.Document(news_id, pk)
+            for pk, news_id in Comment.objects.filter(
+                news_id__in=batch
+            ).values_list('pk', 'news_id')
+        ]
+        search.get_index().remove(documents)
+        # Внутри транзакции подзапрос каждый раз отбирает те же новости:
+        # они удаляются последним запросом.
+        subquery = batch.query.sql_with_params()
+        with connection.cursor() as cursor:
+            for source, target, column in MOVES:
+                copy_rows(cursor, source, target, column, subquery)
+            # Сначала комментарии: на новости ссылается внешний ключ.
+            moved = [
+                delete_rows(cursor, source, column, subquery)
+                for source, _, column in reversed(MOVES)
+            ]
+    invalidate_home()
+    comments, news = moved
+    return news, comments
+
+
+def archive_news(before, batch_size=None):
+    """Переносит все старые новости; отдаёт итоги каждой пачки."""
+    batch_size = batch_size or settings.NEWS_ARCHIVE_BATCH_SIZE
+    while True:
+        news, comments = archive_batch(before, batch_size)
+        if not news:
+            return
+        yield news, comments
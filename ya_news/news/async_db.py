@@ -0,0 +1,60 @@
+"""Доступ к базе из асинхронных представлений.
+
+ORM синхронный, поэтому запросы выполняются в отдельном пуле потоков
+размером NEWS_ASYNC_DB_WORKERS, а не в общем потоке thread_sensitive:
+запросы разных клиентов идут параллельно, а число одновременных
+соединений с базой ограничено размером пула.
+
+У каждого потока пула своё соединение, и оно живёт между задачами
+независимо от CONN_MAX_AGE: пул и есть пул соединений, а переподключение
+на каждую задачу обходилось дороже самого запроса. Соединение
+закрывается только после ошибки базы.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connections
+from django.dispatch import receiver
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.NEWS_ASYNC_DB_WORKERS,
+            thread_name_prefix='news-db',
+        )
+    return _executor
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    global _executor
+    if setting == 'NEWS_ASYNC_DB_WORKERS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def database_sync_to_async(func):
+    """Асинхронная обёртка над func, выполняемая в пуле потоков базы."""
+    @wraps(func)
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except DatabaseError:
+            for connection in connections.all():
+                connection.close_if_unusable_or_obsolete()
+            raise
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(
+            run, thread_sensitive=False, executor=get_executor()
+        )(*args, **kwargs)
+
+    return wrapper
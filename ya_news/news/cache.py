@@ -0,0 +1,50 @@
+"""Версия кэшированных фрагментов главной страницы.
+
+Версия входит в ключ фрагмента ({% cache ... version %}), поэтому
+при изменении данных достаточно увеличить её: старые фрагменты
+просто перестают запрашиваться и вытесняются бэкендом кэша.
+
+Версия хранится в кэше default, поэтому при нескольких процессах
+он должен быть общим, иначе запись в одном процессе не сбросит
+фрагменты в остальных. Проверка news.E001 (news.checks) не даёт
+запустить сервер вне DEBUG с кэшем процесса. Фрагменты страницы
+новости и её ETag привязаны к News.revision из базы.
+"""
+import time
+
+from django.core.cache import cache
+
+HOME_VERSION_KEY = 'news:home:version'
+
+
+def initial_version():
+    """Начальная версия — текущее время в микросекундах.
+
+    Если ключ версии вытеснят из кэша, новая версия не совпадёт
+    ни с одной из выданных ранее.
+    """
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, initial_version(), timeout=None)
+
+
+def home_version():
+    return get_version(HOME_VERSION_KEY)
+
+
+def invalidate_home():
+    """Сбрасывает фрагменты главной страницы."""
+    bump_version(HOME_VERSION_KEY)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Бэкенды, у которых у каждого процесса свой кэш.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Вне DEBUG кэш default должен быть общим для всех процессов.
+
+    В нём хранятся версия фрагментов главной (news.cache) и ещё
+    не сохранённые комментарии очереди (news.comment_queue): с кэшем
+    процесса запись в одном воркере не видна в остальных.
+    """
+    if settings.DEBUG:
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кэш default ({backend}) не общий для процессов сервера.',
+        hint='Задайте FileBasedCache, Memcached или Redis, как в '
+             'yanews.settings_production.',
+        id='news.E001',
+    )]
@@ -0,0 +1,424 @@
+"""Отложенная запись комментариев (NEWS_COMMENT_QUEUE).
+
+Проверенный формой комментарий дописывается строкой JSON в журнал
+процесса journal-<pid>.jsonl в NEWS_COMMENT_QUEUE_DIR, и запрос
+на этом заканчивается. Разбор очереди — фоновый поток процесса или
+команда flush_comment_queue --loop — раз в NEWS_COMMENT_QUEUE_MAX_DELAY
+секунд, а при накоплении NEWS_COMMENT_QUEUE_BATCH_SIZE записей сразу,
+переименовывает журналы в batch-<pid>-<uuid>.jsonl и сохраняет их
+пачками через bulk_create. Так комментарий попадает в базу не позже
+чем через MAX_DELAY секунд плюс время записи пачки, а в базу пишет
+один поток на процесс, а не каждый запрос.
+
+Запись в журнал и его переименование разделены flock, так что журнал
+можно забрать у работающего процесса. После сбоя журналы и пачки
+остаются на диске и подбираются первым же разбором очереди: пачки
+умерших процессов тоже забираются переименованием. Записи, уже
+сохранённые до сбоя, узнаются по Comment.queue_id и повторно
+не вставляются.
+
+Если пачка не сохраняется, её записи сохраняются по одной. Записи,
+на которых база недоступна (OperationalError), остаются в пачке
+до следующего разбора. Записи, которые не сохраняются и по одной,
+переносятся в dead-<pid>-<uuid>.jsonl: разбор такие файлы не трогает,
+и одна испорченная запись не останавливает очередь.
+
+Пока комментарий в очереди, автор видит его на странице новости:
+записи хранятся в кэше по пользователю (при нескольких процессах
+нужен общий бэкенд кэша).
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .cache import invalidate_home
+from .models import Comment, News
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'news:pending:{user_pk}'
+# Сколько последних записей пользователя показывать до сохранения.
+PENDING_LIMIT = 20
+# Сколько держать в кэше записи, которые так и не удалось сохранить.
+PENDING_TIMEOUT = 60 * 60
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def file_pid(name):
+    """Номер процесса из имени journal-<pid>.jsonl или batch-<pid>-..."""
+    try:
+        return int(name.split('-')[1].split('.')[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def append_line(path, line, fsync):
+    """Дописывает строку в журнал под flock.
+
+    Если журнал успели переименовать между open и flock, дескриптор
+    указывает уже на забранный файл, и запись повторяется в новый.
+    """
+    while True:
+        descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            if not same_file(descriptor, path):
+                continue
+            os.write(descriptor, line)
+            if fsync:
+                os.fsync(descriptor)
+            return
+        finally:
+            os.close(descriptor)
+
+
+def same_file(descriptor, path):
+    try:
+        return os.fstat(descriptor).st_ino == os.stat(path).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def take_file(path, target):
+    """Переименовывает журнал, дождавшись конца текущей записи в него."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+        if not same_file(descriptor, path):
+            return False
+        os.rename(path, target)
+        return True
+    finally:
+        os.close(descriptor)
+
+
+def read_entries(path):
+    """Записи файла очереди; недописанная при сбое строка пропускается."""
+    entries = []
+    with open(path, encoding='utf-8') as queue_file:
+        for line in queue_file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning('%s: пропущена повреждённая запись', path)
+    return entries
+
+
+def write_entries(path, entries):
+    with open(path, 'w', encoding='utf-8') as queue_file:
+        for entry in entries:
+            queue_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+def batches(entries, size):
+    iterator = iter(entries)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_batch(entries):
+    """Сохраняет пачку записей, пропуская уже сохранённые.
+
+    Записи о новостях и авторах, удалённых, пока комментарий стоял
+    в очереди, отбрасываются. Возвращает число новых комментариев.
+    """
+    with transaction.atomic():
+        saved = {
+            str(queue_id) for queue_id in Comment.objects.filter(
+                queue_id__in=[entry['queue_id'] for entry in entries]
+            ).values_list('queue_id', flat=True)
+        }
+        entries = [
+            entry for entry in entries if entry['queue_id'] not in saved
+        ]
+        news_ids = set(News.objects.filter(
+            pk__in={entry['news_id'] for entry in entries}
+        ).values_list('pk', flat=True))
+        author_ids = set(get_user_model().objects.filter(
+            pk__in={entry['author_id'] for entry in entries}
+        ).values_list('pk', flat=True))
+        entries = [
+            entry for entry in entries
+            if entry['news_id'] in news_ids
+            and entry['author_id'] in author_ids
+        ]
+        Comment.objects.bulk_create(
+            Comment(
+                queue_id=entry['queue_id'],
+                news_id=entry['news_id'],
+                author_id=entry['author_id'],
+                text=entry['text'],
+                created=parse_datetime(entry['created']),
+            )
+            for entry in entries
+        )
+        counts = Counter(entry['news_id'] for entry in entries)
+        for news_id, count in counts.items():
+            News.objects.filter(pk=news_id).update(
+                comment_count=F('comment_count') + count,
+                revision=F('revision') + 1,
+            )
+        # bulk_create не вызывает post_save, индекс поиска — здесь.
+        search.get_index().add([
+            search.comment_document(comment)
+            for comment in Comment.objects.filter(
+                queue_id__in=[entry['queue_id'] for entry in entries]
+            )
+        ])
+    if counts:
+        invalidate_home()
+    return len(entries)
+
+
+def write_one_by_one(path, entries, retry, dead):
+    """Сохраняет записи по одной, раскладывая несохранённые.
+
+    Записи, на которых база недоступна, идут в retry, прочие
+    несохранённые — в dead. Возвращает число новых комментариев.
+    """
+    saved = 0
+    for entry in entries:
+        try:
+            saved += write_batch([entry])
+        except OperationalError:
+            retry.append(entry)
+        except Exception:
+            logger.exception(
+                '%s: запись %s не сохранена', path, entry.get('queue_id')
+            )
+            dead.append(entry)
+    return saved
+
+
+class CommentQueue:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Пачки своего процесса разбирает один поток за раз.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._queued = 0
+        self._worker = None
+        self._worker_pid = None
+
+    @property
+    def directory(self):
+        return str(settings.NEWS_COMMENT_QUEUE_DIR)
+
+    def journal_path(self):
+        return os.path.join(self.directory, f'journal-{os.getpid()}.jsonl')
+
+    def enqueue(self, news, author, text):
+        """Дописывает комментарий в журнал и возвращает запись очереди."""
+        entry = {
+            'queue_id': str(uuid.uuid4()),
+            'news_id': news.pk,
+            'author_id': author.pk,
+            'text': text,
+            'created': timezone.now().isoformat(),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode()
+        os.makedirs(self.directory, exist_ok=True)
+        append_line(
+            self.journal_path(), line, settings.NEWS_COMMENT_QUEUE_FSYNC
+        )
+        with self._lock:
+            self._queued += 1
+            if self._queued >= settings.NEWS_COMMENT_QUEUE_BATCH_SIZE:
+                self._wakeup.set()
+        remember_pending(author, entry)
+        self.ensure_worker()
+        return entry
+
+    def claim(self):
+        """Забирает в разбор все журналы и пачки умерших процессов."""
+        pid = os.getpid()
+        with self._lock:
+            self._queued = 0
+        if not os.path.isdir(self.directory):
+            return []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith('journal-'):
+                take_file(path, self.batch_path(pid))
+                continue
+            if not name.startswith('batch-'):
+                continue
+            owner = file_pid(name)
+            if owner is None or owner == pid or process_alive(owner):
+                continue
+            try:
+                os.rename(path, self.batch_path(pid))
+            except FileNotFoundError:
+                # Пачку уже забрал другой процесс.
+                continue
+        prefix = f'batch-{pid}-'
+        return sorted(
+            (
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.startswith(prefix)
+            ),
+            key=os.path.getmtime,
+        )
+
+    def batch_path(self, pid, prefix='batch'):
+        return os.path.join(
+            self.directory, f'{prefix}-{pid}-{uuid.uuid4()}.jsonl'
+        )
+
+    def flush(self):
+        """Сохраняет всё, что накопилось; возвращает число комментариев."""
+        saved = 0
+        with self._flush_lock:
+            for path in self.claim():
+                saved += self.flush_file(path)
+        return saved
+
+    def flush_file(self, path):
+        """Сохраняет пачку; несохранённое оставляет или переносит в dead."""
+        retry, dead = [], []
+        saved = 0
+        for batch in batches(
+            read_entries(path), settings.NEWS_COMMENT_QUEUE_BATCH_SIZE
+        ):
+            try:
+                saved += write_batch(batch)
+            except OperationalError:
+                logger.exception('%s: база недоступна', path)
+                retry.extend(batch)
+            except Exception:
+                logger.exception('%s: пачка не сохранена', path)
+                saved += write_one_by_one(path, batch, retry, dead)
+        if dead:
+            dead_path = self.batch_path(os.getpid(), prefix='dead')
+            write_entries(dead_path, dead)
+            logger.error(
+                '%s: %d записей перенесено в %s', path, len(dead), dead_path
+            )
+        if retry:
+            # Переписываем пачку целиком: до os.replace старый файл цел.
+            directory, name = os.path.split(path)
+            temporary = os.path.join(directory, f'.{name}.tmp')
+            write_entries(temporary, retry)
+            os.replace(temporary, path)
+        else:
+            os.remove(path)
+        return saved
+
+    def ensure_worker(self):
+        """Запускает фоновый поток разбора, если он ещё не работает.
+
+        После fork поток родителя в дочернем процессе не существует,
+        поэтому проверяется и pid.
+        """
+        if not settings.NEWS_COMMENT_QUEUE_WORKER:
+            return
+        pid = os.getpid()
+        with self._lock:
+            if self._worker_pid == pid and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self.run, name='comment-queue', daemon=True
+            )
+            self._worker_pid = pid
+            self._stopping.clear()
+            self._worker.start()
+
+    def stop(self):
+        """Останавливает фоновый поток после текущего разбора."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось сохранить очередь комментариев')
+            finally:
+                connection.close()
+            self._wakeup.wait(settings.NEWS_COMMENT_QUEUE_MAX_DELAY)
+            self._wakeup.clear()
+
+
+comment_queue = CommentQueue()
+
+
+def remember_pending(author, entry):
+    """Запоминает запись очереди для показа автору до сохранения.
+
+    Чтение и запись списка в кэше не атомарны: при одновременной
+    отправке двух комментариев одним пользователем один из них может
+    не попасть в список. Сам комментарий при этом уже в журнале
+    и сохранится; автор просто не увидит его до разбора очереди.
+    """
+    key = PENDING_KEY.format(user_pk=author.pk)
+    pending = cache.get(key, [])[-PENDING_LIMIT + 1:]
+    pending.append(entry)
+    cache.set(key, pending, PENDING_TIMEOUT)
+
+
+def pending_comments(user, news_pk):
+    """Комментарии пользователя к новости, ещё не сохранённые в базе."""
+    if not user.is_authenticated:
+        return []
+    key = PENDING_KEY.format(user_pk=user.pk)
+    pending = cache.get(key)
+    if not pending:
+        return []
+    saved = {
+        str(queue_id) for queue_id in Comment.objects.filter(
+            queue_id__in=[entry['queue_id'] for entry in pending]
+        ).values_list('queue_id', flat=True)
+    }
+    if saved:
+        pending = [
+            entry for entry in pending if entry['queue_id'] not in saved
+        ]
+        cache.set(key, pending, PENDING_TIMEOUT)
+    return [
+        {**entry, 'created': parse_datetime(entry['created'])}
+        for entry in pending
+        if entry['news_id'] == news_pk
+    ]
+
+
+def pending_count(user, news_pk):
+    """Число записей в очереди для ETag: без запроса к базе."""
+    if not user.is_authenticated:
+        return 0
+    pending = cache.get(PENDING_KEY.format(user_pk=user.pk)) or []
+    return sum(entry['news_id'] == news_pk for entry in pending)
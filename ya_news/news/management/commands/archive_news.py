@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.archive import archive_cutoff, archive_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит новости старше NEWS_ARCHIVE_AFTER_DAYS с комментариями '
+        'в архив. Каждая пачка — отдельная транзакция, прерванный '
+        'перенос можно запустить снова.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Возраст новости в днях, по умолчанию '
+                 'NEWS_ARCHIVE_AFTER_DAYS.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.NEWS_ARCHIVE_BATCH_SIZE,
+            help='Сколько новостей переносить за одну транзакцию.',
+        )
+
+    def handle(self, *args, days, batch_size, verbosity, **options):
+        total_news = total_comments = 0
+        for news, comments in archive_news(archive_cutoff(days), batch_size):
+            total_news += news
+            total_comments += comments
+            if verbosity > 1:
+                self.stdout.write(
+                    f'Пачка: новостей {news}, комментариев {comments}'
+                )
+        if verbosity:
+            self.stdout.write(self.style.SUCCESS(
+                f'Перенесено в архив новостей: {total_news}, '
+                f'комментариев: {total_comments}'
+            ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from news.comment_queue import comment_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет в базу комментарии из очереди NEWS_COMMENT_QUEUE_DIR, '
+        'в том числе оставшиеся после сбоя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Разбирать очередь непрерывно, вместо потоков процессов '
+                 '(NEWS_COMMENT_QUEUE_WORKER = False).',
+        )
+
+    def handle(self, *args, loop, verbosity, **options):
+        if loop:
+            comment_queue.run()
+        saved = comment_queue.flush()
+        if verbosity:
+            self.stdout.write(
+                self.style.SUCCESS(f'Сохранено комментариев: {saved}')
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from news.search import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново индексирует все новости и комментарии. Нужна один раз '
+        'после миграции: дальше индекс обновляется по одной записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        indexed = rebuild(batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано документов: {indexed}')
+        )
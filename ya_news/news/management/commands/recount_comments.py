@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from news.models import Comment, News
+
+
+def comment_count_subquery():
+    """Подзапрос с количеством комментариев к новости."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(news=OuterRef('pk'))
+            .order_by()
+            .values('news')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает News.comment_count по таблице комментариев.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.update(
+            comment_count=comment_count_subquery(),
+            revision=F('revision') + 1,
+        )
+        if options['verbosity']:
+            self.stdout.write(
+                self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+            )
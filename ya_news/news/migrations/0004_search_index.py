@@ -0,0 +1,66 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'news_search_fts'
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                'CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(value)'
+            )
+        except Exception:
+            return False
+        cursor.execute('DROP TABLE temp.fts5_probe')
+    return True
+
+
+def create_fts(apps, schema_editor):
+    """FTS5-таблица с нормализованным текстом новостей и комментариев.
+
+    rowid кодирует документ (pk * 2 + 1 для комментария), news_id
+    нужен для группировки совпадений по новостям.
+    """
+    if fts5_available(schema_editor.connection):
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} '
+            f'USING fts5(body, news_id UNINDEXED)'
+        )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('comment', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='news.comment')),
+                ('news', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='news.news')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchposting',
+            index=models.Index(fields=['term', 'news'], name='search_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchposting',
+            index=models.Index(fields=['news', 'comment'], name='search_doc_idx'),
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
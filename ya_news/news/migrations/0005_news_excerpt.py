@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpt(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    batch = []
+    for news in News.objects.only('text').iterator(BATCH_SIZE):
+        news.excerpt = Truncator(news.text).words(15, truncate=' …')
+        batch.append(news)
+        if len(batch) >= BATCH_SIZE:
+            News.objects.bulk_update(batch, ('excerpt',))
+            batch = []
+    News.objects.bulk_update(batch, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='queue_id',
+            field=models.UUIDField(default=None, editable=False, null=True, unique=True),
+        ),
+    ]
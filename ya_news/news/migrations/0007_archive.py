@@ -0,0 +1,49 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('news', '0006_comment_queue_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNews',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=50)),
+                ('text', models.TextField()),
+                ('excerpt', models.TextField(blank=True)),
+                ('date', models.DateField()),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Архивная новость',
+                'verbose_name_plural': 'Архивные новости',
+                'ordering': ('-date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='news.archivednews')),
+            ],
+            options={
+                'ordering': ('created', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['news', 'created', 'id'], name='archived_news_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivednews',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
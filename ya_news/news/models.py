@@ -2,21 +2,67 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 15
+# Поля, которые нужны спискам новостей; полный текст в них не грузится.
+NEWS_PREVIEW_FIELDS = ('title', 'date', 'excerpt', 'comment_count')
+
+
+def make_excerpt(text):
+    """Анонс новости — то же, что дал бы фильтр truncatewords:15."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
+    excerpt = models.TextField(blank=True, editable=False)
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Номер изменения: растёт в той же записи, что меняет новость или её
+    # комментарии. Из него строятся ETag и ключи фрагментов страницы.
+    revision = models.PositiveIntegerField(default=0, editable=False)
+
+    archived = False
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Сохраняет анонс вместе с текстом и увеличивает номер изменения.
+
+        Сам анонс считает news.signals.fill_excerpt: loaddata save()
+        не вызывает.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            update_fields = kwargs['update_fields'] = {
+                *update_fields, 'excerpt'
+            }
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+        self.revision = F('revision') + 1
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'revision'}
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            # Новый номер знает только база. Поле становится отложенным
+            # и читается при первом обращении, а не отдельным SELECT
+            # после каждого сохранения; F() не остаётся и после ошибки.
+            del self.revision
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -28,10 +74,107 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Не auto_now_add: news.comment_queue сохраняет комментарий со
+    # временем постановки в очередь, а не разбора.
+    created = models.DateTimeField(default=timezone.now, editable=False)
+    # Идентификатор записи очереди news.comment_queue: по нему повторный
+    # разбор очереди после сбоя пропускает уже сохранённые комментарии.
+    queue_id = models.UUIDField(
+        null=True, unique=True, editable=False, default=None
+    )
+
+    archived = False
+
+    class Meta:
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class ArchivedNews(models.Model):
+    """Новость, перенесённая в архив (news.archive), с прежним pk."""
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=50)
+    text = models.TextField()
+    excerpt = models.TextField(blank=True)
+    date = models.DateField()
+    comment_count = models.PositiveIntegerField(default=0)
+    revision = models.PositiveIntegerField(default=0)
+
+    archived = True
+
+    class Meta:
+        ordering = ('-date',)
+        verbose_name_plural = 'Архивные новости'
+        verbose_name = 'Архивная новость'
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    """Комментарий архивной новости с прежним pk."""
+    id = models.BigIntegerField(primary_key=True)
+    news = models.ForeignKey(
+        ArchivedNews,
+        on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    archived = True
 
     class Meta:
-        ordering = ('created',)
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='archived_news_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class SearchPosting(models.Model):
+    """Запись инвертированного индекса для поиска без FTS5.
+
+    Связи без ограничений в базе: записи удаляет сам индекс
+    (news.search), а удаление комментариев не тратит лишний запрос.
+    """
+    term = models.CharField(max_length=64)
+    news = models.ForeignKey(
+        News,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('term', 'news'), name='search_term_idx'),
+            models.Index(fields=('news', 'comment'), name='search_doc_idx'),
+        )
@@ -0,0 +1,98 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.functional import cached_property
+
+ORDERING = ('created', 'pk')
+
+
+def encode_cursor(created, pk):
+    """Упаковывает позицию комментария в непрозрачный токен."""
+    raw = f'{created.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен в пару (created, pk)."""
+    padded = token + '=' * (-len(token) % 4)
+    try:
+        created, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError(f'Некорректный курсор: {token}') from error
+
+
+def get_page_size():
+    return settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+
+
+def after_position(queryset, position):
+    """Отбирает комментарии строго после позиции (created, pk).
+
+    Условие записано через created >= ..., чтобы SQLite мог пройти
+    по индексу (news, created, id) диапазоном, а не сканировать его.
+    """
+    created, pk = position
+    return queryset.filter(created__gte=created).exclude(
+        created=created, pk__lte=pk
+    )
+
+
+class CommentPage:
+    """Страница комментариев, выбранная по курсору без OFFSET.
+
+    Курсор проверяется сразу (ValueError для испорченного токена),
+    а сам запрос выполняется лениво, при первом обращении к комментариям.
+    """
+
+    def __init__(self, queryset, after=None, page_size=None):
+        self.queryset = queryset.order_by(*ORDERING)
+        self.after = after
+        self.position = decode_cursor(after) if after else None
+        self.page_size = page_size or get_page_size()
+
+    @cached_property
+    def _rows(self):
+        queryset = self.queryset
+        if self.position is not None:
+            queryset = after_position(queryset, self.position)
+        return list(queryset[:self.page_size + 1])
+
+    @property
+    def object_list(self):
+        return self._rows[:self.page_size]
+
+    @property
+    def has_next(self):
+        return len(self._rows) > self.page_size
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(last.created, last.pk)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def last_page_cursor(queryset, page_size=None):
+    """Курсор страницы с самыми свежими комментариями.
+
+    Возвращает None, если все комментарии помещаются на первую страницу.
+    """
+    if page_size is None:
+        page_size = get_page_size()
+    boundary = list(
+        queryset.order_by('-created', '-pk')
+        .values_list('created', 'pk')[page_size:page_size + 1]
+    )
+    if not boundary:
+        return None
+    return encode_cursor(*boundary[0])
@@ -0,0 +1,137 @@
+"""Поиск запрещённых слов автоматом Ахо — Корасик.
+
+Автомат строится один раз на набор слов и находит все вхождения
+за один проход по тексту, независимо от размера списка.
+"""
+import os
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+def normalize(text):
+    """Нормализует текст: casefold и замена «ё» на «е»."""
+    return text.casefold().replace('ё', 'е')
+
+
+def normalize_with_offsets(text):
+    """Нормализует текст и запоминает исходную позицию каждого символа.
+
+    casefold может менять длину строки («ß» → «ss»), поэтому найденные
+    в нормализованном тексте позиции переводятся обратно по этой карте.
+    Если длина не изменилась, карта не нужна и вместо неё возвращается None.
+    """
+    normalized = normalize(text)
+    if len(normalized) == len(text):
+        return normalized, None
+    chars = []
+    offsets = []
+    for index, char in enumerate(text):
+        folded = normalize(char)
+        chars.append(folded)
+        offsets.extend([index] * len(folded))
+    return ''.join(chars), offsets
+
+
+class Matcher:
+    """Автомат Ахо — Корасик для набора слов."""
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word in words:
+            word = normalize(word.strip())
+            if word:
+                self._add(word)
+        self._build_fail_links()
+
+    def _add(self, word):
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        if word not in self._output[node]:
+            self._output[node] += (word,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def _scan(self, normalized):
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for position, char in enumerate(normalized):
+            next_node = goto[node].get(char)
+            while next_node is None and node:
+                node = fail[node]
+                next_node = goto[node].get(char)
+            node = next_node or 0
+            for word in output[node]:
+                yield position + 1 - len(word), position + 1, word
+
+    def finditer(self, text):
+        """Возвращает вхождения (start, end, слово) в координатах text."""
+        normalized, offsets = normalize_with_offsets(text)
+        for start, end, word in self._scan(normalized):
+            if offsets is None:
+                yield start, end, word
+            else:
+                yield offsets[start], offsets[end - 1] + 1, word
+
+    def search(self, text):
+        """Первое вхождение или None."""
+        return next(self.finditer(text), None)
+
+    def __bool__(self):
+        return bool(self._goto[0])
+
+
+def read_words_file(path):
+    """Читает список слов: по одному в строке, «#» — комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        return tuple(
+            line.strip() for line in words_file
+            if line.strip() and not line.lstrip().startswith('#')
+        )
+
+
+@lru_cache(maxsize=4)
+def _build_matcher(words, path, mtime):
+    if path:
+        words += read_words_file(path)
+    return Matcher(words)
+
+
+def get_matcher(words=()):
+    """Автомат для words и списка из файла settings.BAD_WORDS_FILE.
+
+    Автомат пересобирается, только если изменился набор слов
+    или время изменения файла.
+    """
+    path = settings.BAD_WORDS_FILE
+    mtime = os.stat(path).st_mtime_ns if path else None
+    return _build_matcher(tuple(words), path, mtime)
+
+
+@receiver(setting_changed)
+def reset_matcher(setting, **kwargs):
+    if setting == 'BAD_WORDS_FILE':
+        _build_matcher.cache_clear()
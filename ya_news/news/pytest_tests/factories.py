@@ -0,0 +1,147 @@
+"""Массовое создание объектов для тестов.
+
+Функции вставляют объекты одним запросом на модель и возвращают их
+с заполненными pk. Время created задаётся при вставке, а не вторым
+save(). То, что обычно считают save() и сигналы (анонс, счётчик
+комментариев, номер изменения, поисковый индекс, версия кэша),
+заполняется здесь же.
+"""
+from datetime import timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from news import search
+from news.cache import invalidate_home
+from news.models import Comment, News, make_excerpt
+
+# Сквозная нумерация, чтобы имена пользователей не повторялись.
+sequence = count(1)
+# Комментариев в большом обсуждении (фикстура large_thread).
+LARGE_THREAD_SIZE = 10_000
+
+
+def insert(model, objects):
+    """Вставляет объекты одним executemany, минуя компилятор запросов.
+
+    Первичные ключи назначаются заранее, следом за текущим
+    максимальным: executemany их не возвращает. save() и pre_save
+    не вызываются, поэтому auto_now и auto_now_add не действуют —
+    время задаётся в самих объектах.
+    """
+    meta = model._meta
+    fields = meta.concrete_fields
+    # Само соединение, а не прокси django.db.connection: к нему
+    # обращаются на каждое значение.
+    db = connections[DEFAULT_DB_ALIAS]
+    last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    for pk, obj in enumerate(objects, start=last + 1):
+        obj.pk = pk
+        obj._state.adding = False
+        obj._state.db = db.alias
+    quote = db.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with db.cursor() as cursor:
+        cursor.executemany(sql, [
+            [
+                field.get_db_prep_save(getattr(obj, field.attname), db)
+                for field in fields
+            ]
+            for obj in objects
+        ])
+    return objects
+
+
+def make_users(number, prefix='user'):
+    User = get_user_model()
+    return insert(User, [
+        User(username=f'{prefix}-{next(sequence)}') for _ in range(number)
+    ])
+
+
+def make_news(number, start=None, step=timedelta(days=1), text='Текст.',
+              index=True):
+    """Новости в количестве number с датами от start назад с шагом step.
+
+    С index=False новости не попадают в поисковый индекс: стемминг
+    текста занимает большую часть времени создания.
+    """
+    start = start or timezone.localdate()
+    news_list = insert(News, [
+        News(
+            title=f'Новость {index}',
+            text=text,
+            excerpt=make_excerpt(text),
+            date=start - step * index,
+        )
+        for index in range(number)
+    ])
+    if index:
+        search.get_index().add([
+            search.news_document(news) for news in news_list
+        ])
+    return news_list
+
+
+def make_comments(news, authors, number, start=None,
+                  step=timedelta(minutes=1), text='Комментарий {index}',
+                  index=True):
+    """Комментарии к news в количестве number, авторы — по кругу.
+
+    created идёт от start вперёд с шагом step, поэтому порядок
+    комментариев совпадает с порядком в списке. index — как
+    в make_news.
+    """
+    start = start or timezone.now()
+    comments = insert(Comment, [
+        Comment(
+            news_id=news.pk,
+            author_id=authors[index % len(authors)].pk,
+            text=text.format(index=index),
+            created=start + step * index,
+        )
+        for index in range(number)
+    ])
+    News.objects.filter(pk=news.pk).update(
+        comment_count=F('comment_count') + number,
+        revision=F('revision') + 1,
+    )
+    news.comment_count += number
+    news.revision += 1
+    if index:
+        search.get_index().add([
+            search.comment_document(comment) for comment in comments
+        ])
+    invalidate_home()
+    return comments
+
+
+def shared_dataset(django_db_blocker, build):
+    """Тело фикстуры с областью module или class — аналог setUpTestData.
+
+    Данные создаются один раз в транзакции, которая откатывается
+    после последнего теста; транзакции тестов вложены в неё точками
+    сохранения. Тесты не должны менять эти данные, а тестам
+    с transaction=True они не подходят.
+    """
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        try:
+            data = build()
+        except BaseException as error:
+            atomic.__exit__(type(error), error, error.__traceback__)
+            raise
+    try:
+        yield data
+    finally:
+        with django_db_blocker.unblock():
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
@@ -0,0 +1,112 @@
+import sqlite3
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from news import search
+from news.archive import archive_batch, archive_cutoff
+from news.models import ArchivedComment, ArchivedNews, Comment, News
+from news.pytest_tests.factories import make_comments, make_news
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def old_news(settings, author):
+    start = timezone.localdate() - timedelta(
+        days=settings.NEWS_ARCHIVE_AFTER_DAYS + 1
+    )
+    news_list = make_news(3, start=start, text='Старая новость.')
+    make_comments(news_list[0], [author], 3, text='Старый {index}')
+    return news_list
+
+
+@pytest.fixture
+def archived(old_news):
+    call_command('archive_news', batch_size=2, verbosity=0)
+    return old_news
+
+
+def test_old_news_are_moved_with_comments(archived, news, comment):
+    assert list(News.objects.all()) == [news]
+    assert list(Comment.objects.all()) == [comment]
+    assert ArchivedNews.objects.count() == len(archived)
+    moved = ArchivedComment.objects.filter(news_id=archived[0].pk)
+    assert [comment.text for comment in moved] == [
+        'Старый 0', 'Старый 1', 'Старый 2'
+    ]
+    assert ArchivedNews.objects.get(pk=archived[0].pk).comment_count == 3
+
+
+def test_archived_news_detail(archived, author_client):
+    url = reverse('news:detail', args=(archived[0].pk,))
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['news'].archived
+    assert [comment.text for comment in response.context['comments']] == [
+        'Старый 0', 'Старый 1', 'Старый 2'
+    ]
+    # Архив только для чтения: ни формы, ни ссылок на правку.
+    assert 'form' not in response.context
+    assert 'Редактировать' not in response.content.decode()
+    response = author_client.post(url, data={'text': 'Поздно'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_archived_news_detail_streaming(archived, settings, client):
+    settings.NEWS_DETAIL_STREAMING = True
+    response = client.get(reverse('news:detail', args=(archived[0].pk,)))
+    content = b''.join(response.streaming_content).decode()
+    assert 'Старый 2' in content
+
+
+def test_archived_news_are_not_searched(archived):
+    assert search.SearchResults('Старая').count() == 0
+
+
+def test_failed_batch_is_rolled_back(old_news, monkeypatch):
+    def fail(self, documents):
+        raise RuntimeError
+
+    monkeypatch.setattr(type(search.get_index()), 'remove', fail)
+    with pytest.raises(RuntimeError):
+        archive_batch(archive_cutoff(), 10)
+    assert News.objects.count() == len(old_news)
+    assert Comment.objects.count() == 3
+    assert not ArchivedNews.objects.exists()
+
+
+def test_command_reports_totals(old_news):
+    out = StringIO()
+    call_command('archive_news', batch_size=2, stdout=out)
+    assert 'новостей: 3, комментариев: 3' in out.getvalue()
+    # Повторный запуск переносить уже нечего.
+    assert archive_batch(archive_cutoff(), 2) == (0, 0)
+
+
+@pytest.mark.parametrize('index', [search.Fts5Index, search.PostingsIndex])
+def test_batch_larger_than_sqlite_variable_limit(
+    index, monkeypatch, settings, author
+):
+    monkeypatch.setattr(search, 'get_index', index)
+    start = timezone.localdate() - timedelta(
+        days=settings.NEWS_ARCHIVE_AFTER_DAYS + 1
+    )
+    news_list = make_news(1000, start=start, index=False)
+    make_comments(news_list[0], [author], 1000, index=False)
+    connection.ensure_connection()
+    # Сборки SQLite по умолчанию допускают 999 переменных в запросе.
+    limit = connection.connection.setlimit(
+        sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999
+    )
+    try:
+        assert archive_batch(archive_cutoff(), 1000) == (1000, 1000)
+    finally:
+        connection.connection.setlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, limit
+        )
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import resolve, reverse
+from news import views
+from news.archive import archive_cutoff
+from news.models import News
+
+# Асинхронные представления читают базу из пула потоков со своими
+# соединениями, поэтому данные теста должны быть закоммичены.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+DAY = timedelta(days=1)
+
+
+@pytest.mark.parametrize(
+    'name, args, view_class',
+    (
+        ('news:home', (), views.AsyncNewsList),
+        ('news:detail', (1,), views.AsyncNewsDetailView),
+    ),
+)
+def test_urlconf_selects_async_views(async_views, name, args, view_class):
+    assert resolve(reverse(name, args=args)).func.view_class is view_class
+
+
+def test_home_page(async_views, client, news):
+    response = client.get(reverse('news:home'))
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['object_list']) == [news]
+
+
+def test_detail_page(async_views, author_client, comment, news):
+    url = reverse('news:detail', args=(news.pk,))
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['news'] == news
+    assert list(response.context['comments']) == [comment]
+    assert 'form' in response.context
+    response = author_client.get(
+        url, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_page_not_found(async_views, client):
+    response = client.get(reverse('news:detail', args=(1,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_archived_detail_page(async_views, author_client, comment, news):
+    News.objects.filter(pk=news.pk).update(date=archive_cutoff() - DAY)
+    call_command('archive_news', verbosity=0)
+    response = author_client.get(reverse('news:detail', args=(news.pk,)))
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['news'].archived
+    assert [item.text for item in response.context['comments']] == [
+        comment.text
+    ]
+    assert 'form' not in response.context
+
+
+def test_comment_post(async_views, author_client, news, form_data):
+    url = reverse('news:detail', args=(news.pk,))
+    response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert news.comment_set.get().text == form_data['text']
@@ -0,0 +1,192 @@
+import json
+import os
+import time
+import uuid
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from news import search
+from news.comment_queue import comment_queue, process_alive
+from news.models import Comment
+from news.pytest_tests.factories import make_comments
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def queue_mode(settings, tmp_path):
+    settings.NEWS_COMMENT_QUEUE = True
+    settings.NEWS_COMMENT_QUEUE_DIR = tmp_path
+    settings.NEWS_COMMENT_QUEUE_WORKER = False
+    settings.NEWS_COMMENT_QUEUE_FSYNC = False
+    return settings
+
+
+@pytest.fixture
+def dead_pid():
+    pid = 2 ** 22
+    while process_alive(pid):
+        pid += 1
+    return pid
+
+
+def test_queued_comment_is_visible_to_author_only(
+    queue_mode, author_client, news, form_data
+):
+    client = Client()
+    url = reverse('news:detail', args=(news.pk,))
+    response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.count() == 0
+    assert form_data['text'] in author_client.get(url).content.decode()
+    assert form_data['text'] not in client.get(url).content.decode()
+    assert comment_queue.flush() == 1
+    comment = Comment.objects.get()
+    assert comment.text == form_data['text']
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert search.SearchResults(form_data['text']).count() == 1
+    assert author_client.get(url).context['pending_comments'] == []
+    assert form_data['text'] in client.get(url).content.decode()
+
+
+def test_redirect_to_page_with_queued_comment(
+    queue_mode, author_client, author, news, form_data
+):
+    queue_mode.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    make_comments(news, [author], 2, start=timezone.now() - timedelta(hours=1))
+    response = author_client.post(
+        reverse('news:detail', args=(news.pk,)), data=form_data
+    )
+    comment_queue.flush()
+    page = author_client.get(response.url).context['comments']
+    assert Comment.objects.get(text=form_data['text']) in page
+    assert not page.has_next
+
+
+def test_comment_keeps_enqueue_time(queue_mode, author, news):
+    entry = comment_queue.enqueue(news, author, 'Из очереди')
+    comment_queue.flush()
+    assert Comment.objects.get().created.isoformat() == entry['created']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_detail_shows_pending_comments(
+    queue_mode, async_views, author_client, news, form_data
+):
+    url = reverse('news:detail', args=(news.pk,))
+    author_client.post(url, data=form_data)
+    pending = author_client.get(url).context['pending_comments']
+    assert [entry['text'] for entry in pending] == [form_data['text']]
+
+
+def test_profanity_is_rejected_before_queue(
+    queue_mode, author_client, news
+):
+    url = reverse('news:detail', args=(news.pk,))
+    response = author_client.post(url, data={'text': 'Ты негодяй'})
+    assert response.status_code == HTTPStatus.OK
+    assert comment_queue.flush() == 0
+
+
+def test_author_etag_changes_with_pending_comment(
+    queue_mode, author_client, news, form_data
+):
+    url = reverse('news:detail', args=(news.pk,))
+    etag = author_client.get(url)['ETag']
+    author_client.post(url, data=form_data)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_recovery_skips_saved_and_broken_entries(
+    queue_mode, tmp_path, author, news, comment, dead_pid
+):
+    comment.queue_id = uuid.uuid4()
+    comment.save()
+    entries = [
+        {
+            'queue_id': str(queue_id), 'news_id': news.pk,
+            'author_id': author.pk, 'text': text,
+            'created': '2024-01-01T00:00:00+00:00',
+        }
+        for queue_id, text in (
+            (comment.queue_id, comment.text),
+            (uuid.uuid4(), 'После сбоя'),
+        )
+    ]
+    batch = tmp_path / f'batch-{dead_pid}-{uuid.uuid4()}.jsonl'
+    batch.write_text(
+        ''.join(json.dumps(entry) + '\n' for entry in entries)
+        + '{"queue_id": "недописан',
+        encoding='utf-8',
+    )
+    (tmp_path / f'journal-{os.getpid()}.jsonl').write_text(
+        json.dumps({**entries[1], 'queue_id': str(uuid.uuid4())}) + '\n',
+        encoding='utf-8',
+    )
+    assert comment_queue.flush() == 2
+    assert Comment.objects.filter(text='После сбоя').count() == 2
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_saves_within_max_delay(queue_mode, author, news):
+    queue_mode.NEWS_COMMENT_QUEUE_WORKER = True
+    queue_mode.NEWS_COMMENT_QUEUE_MAX_DELAY = 0.05
+    try:
+        comment_queue.enqueue(news, author, 'Из очереди')
+        deadline = time.monotonic() + 5
+        # Ждём по файлам очереди: чтение таблицы во время записи потока
+        # в общую базу в памяти падает с «database table is locked».
+        while os.listdir(queue_mode.NEWS_COMMENT_QUEUE_DIR):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        comment_queue.stop()
+    assert Comment.objects.exists()
+
+
+def test_failing_entry_moves_to_dead_letter(
+    queue_mode, tmp_path, author, news
+):
+    entries = [
+        {
+            'queue_id': str(uuid.uuid4()), 'news_id': news.pk,
+            'author_id': author.pk, 'text': 'Сохранится',
+            'created': '2024-01-01T00:00:00+00:00',
+        },
+        # Без текста запись не сохранить ни в пачке, ни отдельно.
+        {'queue_id': str(uuid.uuid4()), 'news_id': news.pk},
+    ]
+    (tmp_path / f'journal-{os.getpid()}.jsonl').write_text(
+        ''.join(json.dumps(entry) + '\n' for entry in entries),
+        encoding='utf-8',
+    )
+    assert comment_queue.flush() == 1
+    assert comment_queue.flush() == 0
+    [name] = os.listdir(tmp_path)
+    assert name.startswith(f'dead-{os.getpid()}-')
+    with open(tmp_path / name, encoding='utf-8') as dead:
+        assert [json.loads(line) for line in dead] == entries[1:]
+
+
+def test_unavailable_database_keeps_batch(
+    queue_mode, monkeypatch, tmp_path, author, news
+):
+    def unavailable(entries):
+        raise OperationalError('database is locked')
+
+    comment_queue.enqueue(news, author, 'Из очереди')
+    with monkeypatch.context() as patch:
+        patch.setattr('news.comment_queue.write_batch', unavailable)
+        assert comment_queue.flush() == 0
+    [name] = os.listdir(tmp_path)
+    assert name.startswith(f'batch-{os.getpid()}-')
+    assert comment_queue.flush() == 1
+    assert os.listdir(tmp_path) == []
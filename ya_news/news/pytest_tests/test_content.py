@@ -1,7 +1,14 @@
 import pytest
 from django.urls import reverse
 from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from news.checks import check_shared_cache
 from news.forms import CommentForm
+from news.models import News, make_excerpt
+from news.pagination import last_page_cursor
+from news.pytest_tests.factories import LARGE_THREAD_SIZE
 from http import HTTPStatus
 
 pytestmark = pytest.mark.django_db
@@ -60,3 +67,198 @@ def test_authorized_client_has_form(
     assert response.status_code == HTTPStatus.OK
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_comments_keyset_pagination(client, news, comments_list, settings):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 5
+    url = reverse('news:detail', args=(news.id,))
+    seen = []
+    cursor = None
+    while True:
+        response = client.get(url, {'after': cursor} if cursor else None)
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['comments']
+        assert len(page) <= settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+        seen.extend(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == comments_list
+
+
+def test_broken_cursor_is_not_found(client, news):
+    url = reverse('news:detail', args=(news.id,))
+    response = client.get(url, {'after': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    'backend',
+    (
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.filebased.FileBasedCache',
+    ),
+)
+def test_anonymous_home_is_served_from_cache(
+    client, news_list, settings, tmp_path, backend,
+    django_assert_num_queries
+):
+    settings.CACHES = {
+        'default': {'BACKEND': backend, 'LOCATION': str(tmp_path)}
+    }
+    url = reverse('news:home')
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content
+
+
+def test_server_requires_shared_cache(settings, tmp_path):
+    settings.DEBUG = False
+    assert [error.id for error in check_shared_cache(None)] == ['news.E001']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    assert check_shared_cache(None) == []
+    settings.DEBUG = True
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert check_shared_cache(None) == []
+
+
+def test_new_comment_invalidates_cached_fragments(
+    author_client, client, news, form_data
+):
+    url = reverse('news:detail', args=(news.id,))
+    home_url = reverse('news:home')
+    client.get(url)
+    client.get(home_url)
+    author_client.post(url, data=form_data)
+    assert form_data['text'] in client.get(url).content.decode()
+    assert 'Комментариев: 1' in client.get(home_url).content.decode()
+
+
+def test_detail_not_modified_until_comments_change(
+    author_client, client, news, form_data
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    author_client.post(url, data=form_data)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_detail_etag_does_not_depend_on_process_cache(
+    author_client, client, comment, news, form_data
+):
+    url = reverse('news:detail', args=(news.id,))
+    etag = client.get(url)['ETag']
+    # Кэш другого процесса не видел ни одной записи.
+    cache.clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    author_client.post(
+        reverse('news:edit', args=(comment.pk,)), data=form_data
+    )
+    cache.clear()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert form_data['text'] in response.content.decode()
+
+
+def test_news_save_bumps_revision(news):
+    revision = news.revision
+    news.title = 'Новый заголовок'
+    news.save()
+    assert news.get_deferred_fields() == {'revision'}
+    assert news.revision == revision + 1
+
+
+def test_failed_news_save_can_be_retried(news, monkeypatch):
+    def fail(*args, **kwargs):
+        raise DatabaseError
+
+    revision = news.revision
+    with monkeypatch.context() as patch:
+        patch.setattr(News, 'save_base', fail)
+        with pytest.raises(DatabaseError):
+            news.save()
+    assert news.revision == revision
+    news.save()
+    assert news.revision == revision + 1
+
+
+def test_home_page_uses_stored_excerpt(client, news):
+    url = reverse('news:home')
+    response = client.get(url)
+    object_list = list(response.context['object_list'])
+    assert object_list[0].get_deferred_fields() == {'text', 'revision'}
+    assert object_list[0].excerpt == news.excerpt == 'Текст заметки'
+
+
+def test_excerpt_follows_text(news):
+    news.text = ' '.join(['слово'] * 20)
+    news.save(update_fields=('text',))
+    news.refresh_from_db()
+    assert news.excerpt == ' '.join(['слово'] * 15) + ' …'
+
+
+def test_fixture_news_get_excerpt(client):
+    call_command('loaddata', 'news.json', verbosity=0)
+    loaded = News.objects.all()
+    assert loaded
+    for news in loaded:
+        assert news.excerpt == make_excerpt(news.text)
+    content = client.get(reverse('news:home')).content.decode()
+    assert loaded[0].excerpt in content
+
+
+def test_streaming_detail_sends_news_before_comments(
+    settings, client, news, comments_list
+):
+    settings.NEWS_DETAIL_STREAMING = True
+    settings.NEWS_STREAM_CHUNK_SIZE = 3
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert response.streaming
+    chunks = [chunk.decode() for chunk in response.streaming_content]
+    assert news.text in chunks[0]
+    assert 'Tекст' not in chunks[0]
+    # Начало, 11 комментариев по 3 и конец страницы.
+    assert len(chunks) == 1 + 4 + 1
+    page = ''.join(chunks)
+    positions = [page.index(comment.text) for comment in comments_list]
+    assert positions == sorted(positions)
+
+
+def test_streaming_detail_without_comments(settings, client, news):
+    settings.NEWS_DETAIL_STREAMING = True
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    page = b''.join(response.streaming_content).decode()
+    assert 'Здесь никто ничего не написал' in page
+
+
+def test_large_thread_first_and_last_pages(client, large_thread):
+    url = reverse('news:detail', args=(large_thread.pk,))
+    page_size = settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    first = client.get(url).context['comments']
+    assert [comment.text for comment in first] == [
+        f'Комментарий {index}' for index in range(page_size)
+    ]
+    cursor = last_page_cursor(large_thread.comment_set.all())
+    last = client.get(url, {'after': cursor}).context['comments']
+    assert list(last)[-1].text == (
+        f'Комментарий {LARGE_THREAD_SIZE - 1}'
+    )
+    assert last.next_cursor is None
+
+
+def test_large_thread_is_streamed_whole(settings, client, large_thread):
+    settings.NEWS_DETAIL_STREAMING = True
+    response = client.get(reverse('news:detail', args=(large_thread.pk,)))
+    page = b''.join(response.streaming_content).decode()
+    assert page.count('Комментарий ') == LARGE_THREAD_SIZE
@@ -1,12 +1,15 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
 from pytest_django.asserts import assertRedirects, assertFormError
 
+from django.core.management import call_command
 from django.urls import reverse
 from django.test import Client
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.profanity import Matcher
 
 pytestmark = pytest.mark.django_db
 
@@ -40,6 +43,24 @@ def test_user_can_create_comment(
     assert new_comment.text == form_data['text']
     assert new_comment.news == news
     assert new_comment.author == admin_user
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_redirect_to_last_comments_page(
+    author_client,
+    news,
+    form_data,
+    settings
+):
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    url = reverse('news:detail', args=(news.id,))
+    for _ in range(3):
+        response = author_client.post(url, data=form_data)
+    last_page = author_client.get(response.url)
+    newest = Comment.objects.order_by('created', 'pk').last()
+    assert newest in last_page.context['comments']
+    assert not last_page.context['comments'].has_next
 
 
 def test_user_cant_use_bad_words(
@@ -53,6 +74,25 @@ def test_user_cant_use_bad_words(
     assert Comment.objects.count() == 0
 
 
+def test_matcher_reports_spans():
+    matcher = Matcher(('ёж', 'жук', 'уже'))
+    text = 'Этот ЕЖ — не Жук'
+    found = [(text[start:end], word) for start, end, word in (
+        matcher.finditer(text)
+    )]
+    assert found == [('ЕЖ', 'еж'), ('Жук', 'жук')]
+
+
+def test_bad_words_file(author_client, news, settings, tmp_path):
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# блоклист\nзлодей\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.post(url, data={'text': 'Ну ты и ЗЛОДЕЙ!'})
+    assertFormError(response, form='form', field='text', errors=WARNING)
+    assert Comment.objects.count() == 0
+
+
 def test_author_can_edit_comment(
     author_client,
     news,
@@ -74,10 +114,20 @@ def test_author_can_delete_comment(
     form_data
 ):
     url = reverse('news:delete', args=[comment.pk])
+    News.objects.filter(pk=news.pk).update(comment_count=1)
     response = author_client.delete(url, data=form_data)
     expected_url = reverse('news:detail', args=(news.id,)) + '#comments'
     assertRedirects(response, expected_url)
     assert Comment.objects.count() == 0
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_recount_comments_command(news, comments_list):
+    News.objects.filter(pk=news.pk).update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == len(comments_list)
 
 
 def test_other_user_cant_edit_comment(
@@ -122,3 +172,44 @@ def test_anonymous_cannot_edit_delete_comment(
     comments_count = Comment.objects.count()
     assert response.status_code == HTTPStatus.FOUND
     assert comments_count == expected_count
+
+
+def test_create_comment_queries(
+    author_client,
+    django_assert_num_queries,
+    form_data,
+    news
+):
+    url = reverse('news:detail', args=(news.pk,))
+    # Сессия, пользователь, новость; в точке сохранения INSERT,
+    # индекс поиска и счётчик; курсор последней страницы.
+    with django_assert_num_queries(10):
+        response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_edit_comment_queries(
+    author_client,
+    comment,
+    django_assert_num_queries,
+    form_data
+):
+    url = reverse('news:edit', args=(comment.pk,))
+    # Сессия, пользователь, комментарий, UPDATE, индекс поиска
+    # и номер изменения новости в точке сохранения.
+    with django_assert_num_queries(9):
+        response = author_client.post(url, data=form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+def test_delete_comment_queries(
+    author_client,
+    comment,
+    django_assert_num_queries
+):
+    url = reverse('news:delete', args=(comment.pk,))
+    # Сессия, пользователь; в точке сохранения комментарий, DELETE,
+    # индекс поиска и счётчик.
+    with django_assert_num_queries(8):
+        response = author_client.post(url)
+    assert response.status_code == HTTPStatus.FOUND
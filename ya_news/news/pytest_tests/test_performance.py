@@ -0,0 +1,77 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from yacommon.performance import PerformanceBudgetExceeded, registry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def monitoring(settings, tmp_path):
+    settings.PERFORMANCE_MONITORING = True
+    settings.PERFORMANCE_STATS_DIR = str(tmp_path)
+    registry.reset()
+    yield settings
+    registry.reset()
+
+
+def test_metrics_are_recorded_per_url_name(monitoring, client, news):
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert 'db;dur=' in response['Server-Timing']
+    stats = registry.snapshot()['news:detail']
+    assert stats['count'] == 1
+    assert stats['queries'] >= 1
+    assert stats['template_ms'] > 0
+
+
+def test_budget_violation_raises(monitoring, client, news):
+    monitoring.PERFORMANCE_BUDGETS = {'news:detail': {'queries': 0}}
+    monitoring.PERFORMANCE_BUDGET_ACTION = 'raise'
+    with pytest.raises(PerformanceBudgetExceeded):
+        client.get(reverse('news:detail', args=(news.pk,)))
+
+
+def test_stats_command_reads_dumped_stats(monitoring, client):
+    client.get(reverse('news:home'))
+    registry.dump()
+    out = StringIO()
+    call_command('performance_stats', stdout=out)
+    assert 'news:home' in out.getvalue()
+
+
+def test_sqlite_pragmas_applied_to_new_connections(settings):
+    if connection.vendor != 'sqlite':
+        pytest.skip('PRAGMA есть только у SQLite.')
+    settings.SQLITE_PRAGMAS = {'busy_timeout': 1234, 'cache_size': -2048}
+    new_connection = connection.copy()
+    try:
+        with new_connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 1234
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] == -2048
+    finally:
+        new_connection.close()
+
+
+def test_template_profiling_covers_includes(
+    monitoring, author_client, news
+):
+    monitoring.PERFORMANCE_TEMPLATE_PROFILING = True
+    author_client.get(reverse('news:detail', args=(news.pk,)))
+    templates = registry.snapshot()['news:detail']['templates']
+    assert {
+        'news/detail.html', 'base.html',
+        'includes/header.html', 'includes/errors.html',
+    } <= set(templates)
+    detail = templates['news/detail.html']
+    assert detail['count'] == 1
+    assert 0 < detail['self_ms'] < detail['total_ms']
+    registry.dump()
+    out = StringIO()
+    call_command('performance_stats', templates=20, stdout=out)
+    assert 'includes/header.html' in out.getvalue()
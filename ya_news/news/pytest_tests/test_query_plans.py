@@ -0,0 +1,61 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from news import views
+from news.pagination import CommentPage, after_position, last_page_cursor
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Планы запросов SQLite.'
+    ),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+$')
+
+
+def assert_no_full_scan(queryset):
+    plan = queryset.explain()
+    full_scans = [
+        line for line in plan.splitlines() if FULL_SCAN.search(line.strip())
+    ]
+    assert not full_scans, f'Полный просмотр таблицы:\n{plan}'
+
+
+def make_view(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+def test_home_queryset_uses_index(admin_user):
+    assert_no_full_scan(make_view(views.NewsList, admin_user).get_queryset())
+
+
+def test_comment_pages_use_index(news):
+    comments = news.comment_set.all()
+    page = CommentPage(comments)
+    assert_no_full_scan(page.queryset[:page.page_size + 1])
+    assert_no_full_scan(
+        after_position(page.queryset, (timezone.now(), 1))[:page.page_size]
+    )
+    assert_no_full_scan(
+        comments.order_by('-created', '-pk').values_list('created', 'pk')[:1]
+    )
+    assert last_page_cursor(comments) is None
+
+
+@pytest.mark.parametrize(
+    'view_class',
+    (views.CommentUpdate, views.CommentDelete),
+)
+def test_comment_write_querysets_use_index(view_class, comment, author):
+    view = make_view(view_class, author, pk=comment.pk)
+    assert_no_full_scan(view.get_queryset())
+    assert_no_full_scan(view.get_queryset().filter(pk=comment.pk))
@@ -0,0 +1,143 @@
+import sqlite3
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from yacommon.management.commands.replicate import copy_database
+from yacommon.replicas import STICKY_COOKIE, ReplicaRouter
+
+# В тестах реплика — зеркало default (TEST MIRROR) с отдельным
+# соединением, поэтому данные теста должны быть закоммичены.
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica']
+)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.READ_REPLICAS = ['replica']
+    settings.REPLICA_STICKY_SECONDS = 30
+
+
+@pytest.fixture
+def read_aliases(monkeypatch):
+    """Базы, выбранные для чтений news в любом потоке."""
+    aliases = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        if alias is not None:
+            aliases.append(alias)
+        return alias
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    return aliases
+
+
+def news_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if '"news_' in query['sql']
+    ]
+
+
+def read_queries(client, url):
+    """SQL к таблицам news, ушедшие в основную базу и в реплику."""
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        client.get(url)
+    return news_queries(primary), news_queries(replica)
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', ()),
+        ('news:detail', pytest.lazy_fixture('pk_news')),
+    ),
+)
+def test_reads_go_to_replica(replicas, client, name, args):
+    primary, replica = read_queries(client, reverse(name, args=args))
+    assert primary == []
+    assert replica
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', ()),
+        ('news:detail', pytest.lazy_fixture('pk_news')),
+    ),
+)
+def test_async_reads_go_to_replica(
+    replicas, async_views, read_aliases, client, name, args
+):
+    # Асинхронные представления читают в пуле потоков, мимо
+    # CaptureQueriesContext, поэтому проверяется выбор маршрутизатора.
+    client.get(reverse(name, args=args))
+    assert set(read_aliases) == {'replica'}
+
+
+def test_async_comment_post_reads_primary(
+    replicas, async_views, read_aliases, author_client, pk_news
+):
+    author_client.post(
+        reverse('news:detail', args=pk_news), data={'text': 'Текст'}
+    )
+    assert set(read_aliases) == {'default'}
+
+
+def test_streamed_comments_are_read_from_replica(
+    replicas, settings, client, comment, pk_news
+):
+    settings.NEWS_DETAIL_STREAMING = True
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = client.get(reverse('news:detail', args=pk_news))
+        content = b''.join(response.streaming_content).decode()
+    assert comment.text in content
+    assert news_queries(primary) == []
+    assert any('"news_comment"' in sql for sql in news_queries(replica))
+
+
+def test_reads_stay_on_primary_without_replicas(client, pk_news):
+    primary, replica = read_queries(
+        client, reverse('news:detail', args=pk_news)
+    )
+    assert primary
+    assert replica == []
+
+
+def test_reader_sticks_to_primary_after_comment(
+    replicas, author_client, pk_news
+):
+    url = reverse('news:detail', args=pk_news)
+    with CaptureQueriesContext(connections['replica']) as replica:
+        response = author_client.post(url, data={'text': 'Текст'})
+    assert news_queries(replica) == []
+    assert response.cookies[STICKY_COOKIE]['max-age'] == 30
+    primary, replica = read_queries(author_client, url)
+    assert primary
+    assert replica == []
+
+
+def test_copy_database(tmp_path):
+    source, target = tmp_path / 'source.db', tmp_path / 'target.db'
+    with sqlite3.connect(source) as db:
+        db.execute('CREATE TABLE news (title TEXT)')
+        db.execute("INSERT INTO news VALUES ('Заголовок')")
+    reader = sqlite3.connect(target)
+    copy_database(source, target)
+    # Уже открытое соединение с репликой видит свежую копию.
+    assert reader.execute('SELECT title FROM news').fetchall() == [
+        ('Заголовок',)
+    ]
+    reader.close()
+
+
+def test_replicate_requires_replicas():
+    with pytest.raises(CommandError):
+        call_command('replicate', verbosity=0)
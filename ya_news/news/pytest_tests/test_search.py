@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from news import search
+from news.models import Comment, News
+from news.stemming import stem
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=['fts5', 'postings'])
+def index(request, monkeypatch):
+    if request.param == 'postings':
+        monkeypatch.setattr(search, 'get_index', search.PostingsIndex)
+    return search.get_index()
+
+
+def hits(query):
+    results = search.SearchResults(query)
+    return {
+        hit.news_id: (hit.news_hit, hit.comment_hits)
+        for hit in results[0:results.count()]
+    }
+
+
+def test_stem_reduces_word_forms():
+    assert {stem('новость'), stem('новости'), stem('новостями')} == {
+        stem('новостях')
+    }
+
+
+def test_sqlite_uses_fts5():
+    assert isinstance(search.get_index(), search.Fts5Index)
+
+
+def test_index_backend_is_rechecked_after_reset():
+    search.get_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {search.FTS_TABLE}')
+    try:
+        assert isinstance(search.get_index(), search.Fts5Index)
+        search.reset_index_cache()
+        assert isinstance(search.get_index(), search.PostingsIndex)
+    finally:
+        search.reset_index_cache()
+
+
+def test_hits_are_grouped_by_news(index, author):
+    first = News.objects.create(title='Погода', text='Дожди на неделе')
+    second = News.objects.create(title='Спорт', text='Футбол')
+    for text in ('Опять дождь', 'Дождями не удивить'):
+        Comment.objects.create(news=second, author=author, text=text)
+    assert hits('дожди') == {first.pk: (True, 0), second.pk: (False, 2)}
+    # Все слова запроса должны встретиться в одном документе.
+    assert hits('дожди неделе') == {first.pk: (True, 0)}
+    assert hits('футбол дожди') == {}
+    assert hits('снег') == {}
+    assert hits('') == {}
+
+
+def test_comment_edit_and_delete_update_index(
+    index, author_client, comment, news
+):
+    author_client.post(
+        reverse('news:edit', args=(comment.pk,)), data={'text': 'Выборы'}
+    )
+    assert hits('выборы') == {news.pk: (False, 1)}
+    assert hits('комментария') == {}
+    author_client.post(reverse('news:delete', args=(comment.pk,)))
+    assert hits('выборы') == {}
+
+
+def test_new_comment_is_indexed(index, author_client, news):
+    author_client.post(
+        reverse('news:detail', args=(news.pk,)), data={'text': 'Выборы'}
+    )
+    assert hits('выборы') == {news.pk: (False, 1)}
+
+
+def test_news_delete_removes_documents(index, comment, news):
+    news.delete()
+    assert hits('текст') == {}
+
+
+def test_rebuild_indexes_existing_rows(index, comment, news):
+    index.clear()
+    assert hits('текст') == {}
+    assert search.rebuild(batch_size=1) == 2
+    assert hits('текст') == {news.pk: (True, 1)}
+
+
+def test_search_page(client, news):
+    response = client.get(reverse('news:search'), {'q': 'тексты'})
+    assert response.status_code == HTTPStatus.OK
+    assert [hit.news for hit in response.context['hits']] == [news]
@@ -0,0 +1,269 @@
+"""Поиск по новостям и комментариям.
+
+Индекс хранит нормализованные термины (news.stemming) и обновляется
+по одному документу при каждом изменении новости или комментария.
+На SQLite с FTS5 используется таблица news_search_fts из миграции
+0004_search_index, иначе — инвертированный индекс в модели
+SearchPosting. Совпадения группируются по новостям: для каждой
+новости видно, найдено ли слово в ней самой и в скольких комментариях.
+"""
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Count
+
+from .models import NEWS_PREVIEW_FIELDS, Comment, News, SearchPosting
+from .stemming import terms
+
+FTS_TABLE = 'news_search_fts'
+MAX_TERM_LENGTH = SearchPosting._meta.get_field('term').max_length
+
+# Есть ли таблица FTS5, по псевдониму соединения. Сбрасывается после
+# migrate и перед rebuild: таблица могла появиться или пропасть.
+_fts_tables = {}
+
+
+@dataclass
+class Document:
+    news_id: int
+    comment_id: int = None
+    text: str = ''
+
+    @property
+    def rowid(self):
+        if self.comment_id is None:
+            return self.news_id * 2
+        return self.comment_id * 2 + 1
+
+
+@dataclass
+class Hit:
+    news_id: int
+    news_hit: bool
+    comment_hits: int
+    news: News = None
+
+
+def news_document(news):
+    return Document(news.pk, text=f'{news.title} {news.text}')
+
+
+def comment_document(comment):
+    return Document(comment.news_id, comment.pk, comment.text)
+
+
+def query_chunks(ids):
+    """Части списка id, помещающиеся в параметры одного запроса."""
+    size = connection.features.max_query_params or len(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class Fts5Index:
+    """Индекс в виртуальной таблице FTS5; термины ищутся как префиксы."""
+
+    def add(self, documents):
+        self.remove(documents)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, body, news_id) '
+                f'VALUES (%s, %s, %s)',
+                [
+                    (doc.rowid, ' '.join(terms(doc.text)), doc.news_id)
+                    for doc in documents
+                ],
+            )
+
+    def remove(self, documents):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(doc.rowid,) for doc in documents],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def match(self, query_terms):
+        return ' AND '.join(f'"{term}"*' for term in query_terms)
+
+    def count(self, query_terms):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(DISTINCT news_id) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                (self.match(query_terms),),
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, query_terms, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                SELECT news_id,
+                       MAX(rowid %% 2 = 0) AS news_hit,
+                       SUM(rowid %% 2) AS comment_hits,
+                       MIN(rank) AS score
+                FROM (
+                    -- ORDER BY не даёт SQLite развернуть подзапрос:
+                    -- rank нельзя вычислять внутри агрегатной функции.
+                    SELECT rowid, news_id, rank
+                    FROM {FTS_TABLE}
+                    WHERE {FTS_TABLE} MATCH %s
+                    ORDER BY rank
+                )
+                GROUP BY news_id
+                ORDER BY news_hit DESC, score, news_id DESC
+                LIMIT %s OFFSET %s
+                ''',
+                (self.match(query_terms), limit, offset),
+            )
+            return [
+                Hit(news_id, bool(news_hit), comment_hits)
+                for news_id, news_hit, comment_hits, _ in cursor.fetchall()
+            ]
+
+
+class PostingsIndex:
+    """Инвертированный индекс в таблице SearchPosting (без FTS5).
+
+    Термины сравниваются точно, без префиксов.
+    """
+
+    def add(self, documents):
+        self.remove(documents)
+        SearchPosting.objects.bulk_create(
+            SearchPosting(
+                term=term[:MAX_TERM_LENGTH],
+                news_id=doc.news_id,
+                comment_id=doc.comment_id,
+            )
+            for doc in documents
+            for term in set(terms(doc.text))
+        )
+
+    def remove(self, documents):
+        comment_ids = [
+            doc.comment_id for doc in documents if doc.comment_id
+        ]
+        news_ids = [doc.news_id for doc in documents if not doc.comment_id]
+        for chunk in query_chunks(comment_ids):
+            SearchPosting.objects.filter(comment_id__in=chunk).delete()
+        for chunk in query_chunks(news_ids):
+            SearchPosting.objects.filter(
+                news_id__in=chunk, comment__isnull=True
+            ).delete()
+
+    def clear(self):
+        SearchPosting.objects.all().delete()
+
+    def grouped(self, query_terms):
+        query_terms = {term[:MAX_TERM_LENGTH] for term in query_terms}
+        documents = (
+            SearchPosting.objects.filter(term__in=query_terms)
+            .values('news_id', 'comment_id')
+            .annotate(matched=Count('term', distinct=True))
+            .filter(matched=len(query_terms))
+        )
+        hits = {}
+        for document in documents.iterator():
+            hit = hits.setdefault(
+                document['news_id'], Hit(document['news_id'], False, 0)
+            )
+            if document['comment_id'] is None:
+                hit.news_hit = True
+            else:
+                hit.comment_hits += 1
+        return sorted(
+            hits.values(),
+            key=lambda hit: (hit.news_hit, hit.comment_hits, hit.news_id),
+            reverse=True,
+        )
+
+    def count(self, query_terms):
+        return len(self.grouped(query_terms))
+
+    def search(self, query_terms, offset, limit):
+        return self.grouped(query_terms)[offset:offset + limit]
+
+
+def _fts_table_exists():
+    if connection.alias not in _fts_tables:
+        _fts_tables[connection.alias] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[connection.alias]
+
+
+def reset_index_cache():
+    _fts_tables.clear()
+
+
+def get_index():
+    if connection.vendor == 'sqlite' and _fts_table_exists():
+        return Fts5Index()
+    return PostingsIndex()
+
+
+def document(obj):
+    if isinstance(obj, Comment):
+        return comment_document(obj)
+    return news_document(obj)
+
+
+def index(obj):
+    """Переиндексирует одну новость или один комментарий."""
+    get_index().add([document(obj)])
+
+
+def remove(obj):
+    get_index().remove([document(obj)])
+
+
+def rebuild(batch_size=1000):
+    """Полная переиндексация — нужна один раз после миграции."""
+    reset_index_cache()
+    index = get_index()
+    index.clear()
+    indexed = 0
+    for model, make_document in (
+        (News, news_document), (Comment, comment_document),
+    ):
+        batch = []
+        for obj in model.objects.order_by('pk').iterator(batch_size):
+            batch.append(make_document(obj))
+            if len(batch) >= batch_size:
+                index.add(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            index.add(batch)
+            indexed += len(batch)
+    return indexed
+
+
+class SearchResults:
+    """Ленивая последовательность совпадений для Paginator."""
+
+    def __init__(self, query):
+        self.query_terms = list(dict.fromkeys(terms(query)))
+        self.index = get_index()
+
+    def count(self):
+        if not self.query_terms:
+            return 0
+        return self.index.count(self.query_terms)
+
+    def __getitem__(self, page):
+        if not self.query_terms:
+            return []
+        hits = self.index.search(
+            self.query_terms, page.start, page.stop - page.start
+        )
+        news = News.objects.only(*NEWS_PREVIEW_FIELDS).in_bulk(
+            [hit.news_id for hit in hits]
+        )
+        for hit in hits:
+            hit.news = news.get(hit.news_id)
+        return [hit for hit in hits if hit.news is not None]
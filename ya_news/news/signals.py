@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_save,
+)
+from django.dispatch import receiver
+
+from . import search
+from .cache import invalidate_home
+from .comment_queue import comment_queue
+from .models import Comment, News, make_excerpt
+
+
+@receiver(pre_save, sender=News)
+def fill_excerpt(sender, instance, update_fields, **kwargs):
+    """Пересчитывает анонс, если текст загружен и сохраняется.
+
+    Сигнал приходит и при loaddata (raw=True), где News.save()
+    не вызывается.
+    """
+    if 'text' not in instance.get_deferred_fields() and (
+        update_fields is None or 'text' in update_fields
+    ):
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_home_cache(sender, instance, **kwargs):
+    invalidate_home()
+
+
+@receiver(post_save, sender=News)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, **kwargs):
+    search.index(instance)
+
+
+@receiver(post_delete, sender=News)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove(instance)
+
+
+@receiver(request_started)
+def start_comment_queue(sender, **kwargs):
+    """После перезапуска процесса поток очереди подберёт старые журналы."""
+    if settings.NEWS_COMMENT_QUEUE:
+        comment_queue.ensure_worker()
+
+
+@receiver(post_migrate)
+def reset_search_index_cache(sender, **kwargs):
+    search.reset_index_cache()
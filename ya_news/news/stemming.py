@@ -0,0 +1,48 @@
+"""Лёгкая нормализация русских слов для поискового индекса.
+
+Это не полный стеммер Портера: отрезается только самое длинное
+подходящее окончание (и возвратная частица), а основа остаётся
+не короче MIN_STEM символов. Документы и запросы проходят через одну
+и ту же функцию, поэтому словоформы «новость», «новости», «новостями»
+сводятся к одному термину.
+"""
+import re
+
+WORD = re.compile(r'\w+')
+MIN_STEM = 3
+REFLEXIVE = ('ся', 'сь')
+ENDINGS = tuple(sorted(
+    {
+        # Прилагательные и причастия.
+        'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое',
+        'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых',
+        'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+        # Существительные.
+        'иями', 'ями', 'ами', 'иев', 'ией', 'ием', 'иям', 'иях', 'ях',
+        'ах', 'ам', 'ям', 'ов', 'ев', 'ью', 'ия', 'ии', 'ию', 'а', 'е',
+        'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+        # Глаголы.
+        'ешь', 'ете', 'ет', 'ут', 'ют', 'ишь', 'ите', 'ит', 'ат', 'ят',
+        'ила', 'ыла', 'ена', 'ить', 'ыть', 'ать', 'ять', 'еть', 'ла',
+        'ло', 'ли',
+    },
+    key=len,
+    reverse=True,
+))
+
+
+def stem(word):
+    word = word.casefold().replace('ё', 'е')
+    for suffix in REFLEXIVE:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            break
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def terms(text):
+    """Термины текста в порядке появления."""
+    return [stem(word) for word in WORD.findall(text)]
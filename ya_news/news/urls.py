@@ -1,16 +1,34 @@
+from django.conf import settings
 from django.urls import path
 
 from news import views
 
 app_name = 'news'
 
-urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
-    path(
-        'delete_comment/<int:pk>/',
-        views.CommentDelete.as_view(),
-        name='delete'
-    ),
-    path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
-]
+
+def news_patterns(async_views):
+    """Маршруты news с асинхронными или синхронными главной и новостью."""
+    if async_views:
+        home_view = views.AsyncNewsList.as_view()
+        detail_view = views.AsyncNewsDetailView.as_view()
+    else:
+        home_view = views.NewsList.as_view()
+        detail_view = views.NewsDetailView.as_view()
+    return [
+        path('', home_view, name='home'),
+        path('news/<int:pk>/', detail_view, name='detail'),
+        path('search/', views.NewsSearch.as_view(), name='search'),
+        path(
+            'delete_comment/<int:pk>/',
+            views.CommentDelete.as_view(),
+            name='delete'
+        ),
+        path(
+            'edit_comment/<int:pk>/',
+            views.CommentUpdate.as_view(),
+            name='edit'
+        ),
+    ]
+
+
+urlpatterns = news_patterns(settings.NEWS_ASYNC_VIEWS)
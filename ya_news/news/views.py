@@ -1,49 +1,192 @@
+import asyncio
+from functools import wraps
+from itertools import chain, islice
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+from yacommon.replicas import primary_after_write, read_from_replica
 
+from .archive import comment_model, get_news_or_404, news_revision
+from .async_db import database_sync_to_async
+from .cache import home_version, invalidate_home
+from .comment_queue import comment_queue, pending_comments, pending_count
 from .forms import CommentForm
-from .models import Comment, News
+from .models import NEWS_PREVIEW_FIELDS, ArchivedComment, Comment, News
+from .pagination import (
+    ORDERING, CommentPage, get_page_size, last_page_cursor,
+)
+from .search import SearchResults
+
+
+def latest_news():
+    """
+    Выводим только несколько последних новостей.
+
+    Их количество определяется в настройках проекта.
+    """
+    return News.objects.only(*NEWS_PREVIEW_FIELDS)[
+        :settings.NEWS_COUNT_ON_HOME_PAGE
+    ]
+
 
+def comment_page(news_pk, after, model=Comment):
+    """Страница комментариев новости по курсору из параметра ?after=.
 
+    model — Comment или ArchivedComment для архивной новости.
+    """
+    try:
+        return CommentPage(
+            model.objects.filter(news_id=news_pk).select_related('author'),
+            after=after,
+        )
+    except ValueError:
+        raise Http404('Некорректная страница комментариев.')
+
+
+@method_decorator(read_from_replica, name='dispatch')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
     def get_queryset(self):
-        """
-        Выводим только несколько последних новостей.
+        return latest_news()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cache_timeout'] = settings.NEWS_CACHE_TIMEOUT
+        context['home_version'] = home_version()
+        return context
+
+
+class NewsCommentsMixin:
+    """Страница комментариев и версия кэша новости в контексте."""
+
+    def get_comments(self):
+        return comment_page(
+            self.object.pk, self.request.GET.get('after'),
+            comment_model(self.object),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments()
+        context['cache_timeout'] = settings.NEWS_CACHE_TIMEOUT
+        if settings.NEWS_COMMENT_QUEUE:
+            context['pending_comments'] = pending_comments(
+                self.request.user, self.object.pk
+            )
+        return context
+
+
+def news_detail_etag(request, pk, *args, **kwargs):
+    """Значение ETag страницы новости без загрузки её самой.
+
+    News.revision читается из той же базы, что и страница, и меняется
+    при любом изменении новости и её комментариев; страница
+    комментариев и форма зависят ещё от курсора и пользователя,
+    а в режиме очереди — от его ещё не сохранённых комментариев.
+    """
+    revision = news_revision(pk)
+    if revision is None:
+        return None
+    user_pk = request.user.pk if request.user.is_authenticated else ''
+    after = request.GET.get('after', '')
+    etag = f'{pk}-{revision}-{user_pk}-{after}'
+    if settings.NEWS_COMMENT_QUEUE:
+        etag += f'-{pending_count(request.user, pk)}'
+    return etag
+
+
+# Место комментариев в странице, отрисованной с streaming=True.
+STREAM_MARKER = '<!-- comments -->'
+
+
+def stream_comments(news_pk, user, chunk_size, model=Comment):
+    """HTML всех комментариев новости кусками по chunk_size.
 
-        Их количество определяется в настройках проекта.
-        """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    Комментарии читаются курсором (iterator), поэтому в памяти
+    одновременно не больше одного куска.
+    """
+    template = get_template('news/comment_list.html')
+    comments = (
+        model.objects.filter(news_id=news_pk)
+        .select_related('author')
+        .order_by(*ORDERING)
+        .iterator(chunk_size)
+    )
+    chunk = list(islice(comments, chunk_size))
+    # Пустая первая порция отрисует «никто ничего не написал».
+    yield template.render({'comments': chunk, 'user': user})
+    while chunk:
+        chunk = list(islice(comments, chunk_size))
+        if chunk:
+            yield template.render({'comments': chunk, 'user': user})
 
 
-class NewsDetail(generic.DetailView):
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(condition(etag_func=news_detail_etag), name='dispatch')
+class NewsDetail(NewsCommentsMixin, generic.DetailView):
+    """Страница новости.
+
+    С NEWS_DETAIL_STREAMING страница отдаётся потоком: начало с текстом
+    новости уходит сразу, а за ним — вся ветка комментариев кусками,
+    без разбиения на страницы. Время до первого байта и память
+    не зависят от числа комментариев.
+
+    Новость, которой нет в рабочей таблице, ищется в архиве
+    (news.archive).
+    """
     model = News
     template_name = 'news/detail.html'
+    # И для ArchivedNews, чьё имя в контексте было бы archivednews.
+    context_object_name = 'news'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_news_or_404(self.kwargs['pk'])
+
+    def get(self, request, *args, **kwargs):
+        if not settings.NEWS_DETAIL_STREAMING:
+            return super().get(request, *args, **kwargs)
+        self.object = self.get_object()
+        context = self.get_context_data(object=self.object, streaming=True)
+        head, tail = render_to_string(
+            self.template_name, context, request
+        ).split(STREAM_MARKER)
+        return StreamingHttpResponse(chain(
+            (head,),
+            stream_comments(
+                self.object.pk, request.user,
+                settings.NEWS_STREAM_CHUNK_SIZE,
+                comment_model(self.object),
+            ),
+            (tail,),
+        ))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
+        if self.request.user.is_authenticated and not self.object.archived:
             context['form'] = CommentForm()
         return context
 
 
+@method_decorator(primary_after_write, name='dispatch')
 class NewsComment(
         LoginRequiredMixin,
+        NewsCommentsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -56,26 +199,157 @@ class NewsComment(
         return super().post(request, *args, **kwargs)
 
     def form_valid(self, form):
+        if settings.NEWS_COMMENT_QUEUE:
+            entry = comment_queue.enqueue(
+                self.object, self.request.user, form.cleaned_data['text']
+            )
+            return HttpResponseRedirect(self.get_success_url(entry))
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
+            News.objects.filter(pk=self.object.pk).update(
+                comment_count=F('comment_count') + 1,
+                revision=F('revision') + 1,
+            )
+        invalidate_home()
         return super().form_valid(form)
 
-    def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+    def get_success_url(self, entry=None):
+        url = reverse('news:detail', kwargs={'pk': self.object.pk})
+        comments = self.object.comment_set.all()
+        if entry is None:
+            cursor = last_page_cursor(comments)
+        else:
+            # Комментария из очереди ещё нет в базе: последняя страница
+            # считается так, чтобы после сохранения он попал на неё.
+            created = parse_datetime(entry['created'])
+            cursor = last_page_cursor(
+                comments.filter(created__lte=created), get_page_size() - 1
+            )
+        if cursor:
+            url += f'?after={cursor}'
+        return url + '#comments'
 
 
 class NewsDetailView(generic.View):
+    """Страница новости и добавление комментария по одному адресу."""
+    # Функции представлений собираются один раз, а не на каждый запрос.
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
 
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
+
+
+class AsyncView(generic.View):
+    """Представление с асинхронными обработчиками методов.
+
+    В Django 3.2 View.as_view() всегда возвращает синхронную функцию,
+    и обработчик запросов не стал бы ждать корутину из dispatch().
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        @wraps(view)
+        async def async_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+            return response
+
+        return async_view
+
+
+def resolve_user(request):
+    """Загружает сессию и пользователя, пока мы в пуле потоков базы."""
+    return request.user.is_authenticated
+
+
+def fetch_latest_news():
+    return list(latest_news()), home_version()
+
+
+def fetch_comment_page(news_pk, after, model=Comment):
+    page = comment_page(news_pk, after, model)
+    len(page)
+    return page
+
+
+@method_decorator(read_from_replica, name='dispatch')
+class AsyncNewsList(AsyncView):
+    """Асинхронный вариант NewsList для ASGI."""
+    template_name = 'news/home.html'
+
+    async def get(self, request, *args, **kwargs):
+        (object_list, version), _ = await asyncio.gather(
+            database_sync_to_async(fetch_latest_news)(),
+            database_sync_to_async(resolve_user)(request),
+        )
+        return TemplateResponse(request, self.template_name, {
+            'view': self,
+            'object_list': object_list,
+            'news_list': object_list,
+            'cache_timeout': settings.NEWS_CACHE_TIMEOUT,
+            'home_version': version,
+        })
+
+
+@method_decorator(read_from_replica, name='dispatch')
+class AsyncNewsDetailView(AsyncView):
+    """Асинхронный вариант NewsDetailView для ASGI.
+
+    Новость и страница комментариев запрашиваются одновременно;
+    условный GET проверяется до обращения к базе, как и в NewsDetail.
+    Отправка комментария остаётся синхронной (NewsComment).
+    """
+    template_name = 'news/detail.html'
+
+    async def get(self, request, pk):
+        etag = await database_sync_to_async(news_detail_etag)(request, pk)
+        if etag is None:
+            raise Http404('Новость не найдена.')
+        etag = quote_etag(etag)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        news, comments = await asyncio.gather(
+            database_sync_to_async(get_news_or_404)(pk),
+            database_sync_to_async(fetch_comment_page)(
+                pk, request.GET.get('after')
+            ),
+        )
+        if news.archived:
+            comments = await database_sync_to_async(fetch_comment_page)(
+                pk, request.GET.get('after'), ArchivedComment
+            )
+        context = {
+            'view': self,
+            'object': news,
+            'news': news,
+            'comments': comments,
+            'cache_timeout': settings.NEWS_CACHE_TIMEOUT,
+        }
+        if settings.NEWS_COMMENT_QUEUE:
+            context['pending_comments'] = await database_sync_to_async(
+                pending_comments
+            )(request.user, news.pk)
+        if request.user.is_authenticated and not news.archived:
+            context['form'] = CommentForm()
+        response = TemplateResponse(request, self.template_name, context)
+        response['ETag'] = etag
+        return response
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(NewsDetailView.comment_view)(
+            request, *args, **kwargs
+        )
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,9 +357,8 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
@@ -93,12 +366,49 @@ class CommentBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
+@method_decorator(primary_after_write, name='dispatch')
 class CommentUpdate(CommentBase, generic.UpdateView):
     """Редактирование комментария."""
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            News.objects.filter(pk=self.object.news_id).update(
+                revision=F('revision') + 1
+            )
+        return response
+
 
+@method_decorator(primary_after_write, name='dispatch')
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
+            News.objects.filter(pk=self.object.news_id).update(
+                comment_count=Greatest(F('comment_count') - 1, 0),
+                revision=F('revision') + 1,
+            )
+        invalidate_home()
+        return response
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по новостям и комментариям к ним."""
+    template_name = 'news/search.html'
+    context_object_name = 'hits'
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_SEARCH_PAGE_SIZE
+
+    def get_queryset(self):
+        return SearchResults(self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общая инфраструктура проектов (yacommon) лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -17,10 +20,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.YacommonConfig',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
+    'yacommon.performance.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,6 +60,33 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Реплика для чтения: копия db.sqlite3, которую обновляет
+    # manage.py replicate. В тестах — та же база, что и default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['yacommon.replicas.ReplicaRouter']
+# Псевдонимы реплик, с которых читают главная и страница новости
+# (yacommon.replicas); пустой список — всё читается из default.
+READ_REPLICAS = []
+# Приложения, модели которых читаются с реплик.
+REPLICA_APPS = ['news']
+# Сколько секунд после записи браузер читает только из default.
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения SQLite, см. settings_production.py.
+SQLITE_PRAGMAS = {}
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
     }
 }
 
@@ -80,3 +112,50 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+# Файл с дополнительным списком запрещённых слов, по одному в строке.
+BAD_WORDS_FILE = None
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+# Отдавать страницу новости потоком со всеми комментариями сразу.
+NEWS_DETAIL_STREAMING = False
+# Сколько комментариев читается из базы и отрисовывается за раз.
+NEWS_STREAM_CHUNK_SIZE = 200
+
+NEWS_SEARCH_PAGE_SIZE = 20
+
+# Асинхронные варианты главной и страницы новости для запуска под ASGI.
+NEWS_ASYNC_VIEWS = False
+# Размер пула потоков (и соединений с базой) асинхронных представлений.
+NEWS_ASYNC_DB_WORKERS = 8
+
+# Отложенная запись комментариев (news.comment_queue).
+NEWS_COMMENT_QUEUE = False
+NEWS_COMMENT_QUEUE_DIR = BASE_DIR / 'comment_queue'
+NEWS_COMMENT_QUEUE_BATCH_SIZE = 500
+# Не дольше стольких секунд комментарий ждёт записи в базу.
+NEWS_COMMENT_QUEUE_MAX_DELAY = 1.0
+NEWS_COMMENT_QUEUE_FSYNC = True
+# False — очередь разбирает только manage.py flush_comment_queue --loop.
+NEWS_COMMENT_QUEUE_WORKER = True
+
+# Новости старше стольких дней manage.py archive_news переносит
+# в архив (news.archive) пачками по NEWS_ARCHIVE_BATCH_SIZE новостей.
+NEWS_ARCHIVE_AFTER_DAYS = 365
+NEWS_ARCHIVE_BATCH_SIZE = 100
+
+# Время жизни кэшированных фрагментов главной и страницы новости, секунды.
+NEWS_CACHE_TIMEOUT = 60 * 5
+
+# Учёт SQL-запросов и времени ответа по именам URL (yacommon.performance).
+PERFORMANCE_MONITORING = False
+PERFORMANCE_STATS_DIR = BASE_DIR / 'performance_stats'
+PERFORMANCE_DUMP_EVERY = 100
+# Время отрисовки по каждому шаблону (включая include); заметно
+# дороже остального учёта, включать на время разбора.
+PERFORMANCE_TEMPLATE_PROFILING = False
+# Например: {'news:home': {'queries': 3, 'total_ms': 200}}.
+PERFORMANCE_BUDGETS = {}
+# 'log' — предупреждение в лог, 'raise' — исключение.
+PERFORMANCE_BUDGET_ACTION = 'log'
@@ -0,0 +1,22 @@
+"""Боевой профиль: DJANGO_SETTINGS_MODULE=yanews.settings_production.
+
+SQLite, шаблоны и соединения настраивает yacommon.production.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+# yacommon импортируется после .settings: тот добавляет его в sys.path.
+from yacommon.production import SQLITE_PRAGMAS, configure  # noqa: F401
+
+DEBUG = False
+
+# Версия фрагментов главной и очередь комментариев должны быть общими
+# для всех воркеров (news.checks).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'django_cache',
+    },
+}
+
+configure(TEMPLATES, DATABASES)
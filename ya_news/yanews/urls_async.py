@@ -0,0 +1,17 @@
+"""Корневой URLconf с асинхронными представлениями news.
+
+Для ASGI-развёртывания: ROOT_URLCONF = 'yanews.urls_async'.
+Настройка NEWS_ASYNC_VIEWS читается только при импорте news.urls,
+поэтому переключать представления на лету удобнее через этот модуль.
+"""
+from django.urls import include, path
+from news.urls import app_name, news_patterns
+from yanews import urls
+
+urlpatterns = [
+    path('', include((news_patterns(async_views=True), app_name))),
+    *[
+        pattern for pattern in urls.urlpatterns
+        if getattr(pattern, 'app_name', None) != app_name
+    ],
+]
@@ -0,0 +1,12 @@
+"""Бенчмарки проекта YaNote.
+
+Запускаются из директории ya_note: python -m benchmarks.<имя>.
+"""
+import os
+
+
+def setup_django(settings_module='yanote.settings'):
+    """Настраивает Django для скриптов, запущенных вне manage.py."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
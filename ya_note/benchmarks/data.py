@@ -0,0 +1,65 @@
+"""Генерация больших наборов данных для нагрузочных сценариев YaNote."""
+import random
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+
+from notes.models import Note
+
+# Размеры при scale=1.
+SIZES = {'users': 10_000, 'notes': 1_000_000}
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+BATCH_SIZE = 5_000
+
+
+def scaled_sizes(scale):
+    return {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+
+
+def batches(objects, size=BATCH_SIZE):
+    iterator = iter(objects)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def random_word(rng, min_length=4, max_length=10):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def sentence(rng, words):
+    return ' '.join(random_word(rng) for _ in range(words))
+
+
+def seed(scale, rng_seed=42, stdout=print):
+    """Заполняет базу; повторный вызов на заполненной базе ничего не делает.
+
+    Заметки распределены по пользователям равномерно, slug уникальны
+    по построению, поэтому вставка идёт чистым bulk_create.
+    """
+    sizes = scaled_sizes(scale)
+    if Note.objects.count() >= sizes['notes']:
+        stdout(f'Данные уже созданы: {sizes}')
+        return sizes
+    rng = random.Random(rng_seed)
+    User = get_user_model()
+    for batch in batches(
+        User(username=f'bench-{index}') for index in range(sizes['users'])
+    ):
+        User.objects.bulk_create(batch)
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    for batch in batches(
+        Note(
+            title=sentence(rng, 3)[:100],
+            text=sentence(rng, rng.randint(10, 200)),
+            slug=f'bench-{index}',
+            author_id=user_ids[index % len(user_ids)],
+        )
+        for index in range(sizes['notes'])
+    ):
+        Note.objects.bulk_create(batch)
+    stdout(f'Создано: {sizes}')
+    return sizes
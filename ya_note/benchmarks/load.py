@@ -0,0 +1,106 @@
+"""Нагрузочные сценарии YaNote через тестовый клиент Django.
+
+python -m benchmarks.load --scale 0.01 --requests 200 [--keepdb]
+    [--compare benchmarks/results/ya_note-<commit>.json]
+
+При --scale 1 создаётся 1M заметок от 10k пользователей. Данные
+пишутся в отдельную базу (--db), а не в рабочую; с --keepdb она
+переиспользуется между запусками.
+Результаты сохраняются в JSON для сравнения между коммитами.
+"""
+import argparse
+import random
+
+from benchmarks import setup_django
+
+PROJECT = 'ya_note'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=0.01)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--db', default='benchmarks/bench.sqlite3')
+    parser.add_argument('--keepdb', action='store_true')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--compare', default=None)
+    return parser.parse_args()
+
+
+def build_scenarios(rng):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    user = get_user_model().objects.order_by('?').first()
+    author = Client()
+    author.force_login(user)
+    list_url = reverse('notes:list')
+    add_url = reverse('notes:add')
+    search_url = reverse('notes:search')
+    slugs = list(
+        Note.objects.filter(author=user).values_list('slug', flat=True)
+    )
+    words = ' '.join(
+        Note.objects.filter(author=user).values_list('title', flat=True)
+    ).split()
+
+    def random_detail_url():
+        return reverse('notes:detail', args=(rng.choice(slugs),))
+
+    return {
+        'note_list': lambda: author.get(list_url),
+        'note_detail': lambda: author.get(random_detail_url()),
+        'note_search': lambda: author.get(
+            search_url, {'q': rng.choice(words)[:5]}
+        ),
+        'note_create': lambda: author.post(
+            add_url, data={'title': 'Заметка под нагрузкой', 'text': 'Текст'}
+        ),
+    }
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from benchmarks import data
+    from yacommon import harness
+
+    setup_test_environment()
+    connection.settings_dict['TEST']['NAME'] = args.db
+    old_name = connection.creation.create_test_db(
+        verbosity=0, keepdb=args.keepdb, serialize=False
+    )
+    try:
+        sizes = data.seed(args.scale)
+        scenarios = build_scenarios(random.Random(42))
+        results = {
+            'project': PROJECT,
+            'commit': harness.current_commit(),
+            'scale': args.scale,
+            'sizes': sizes,
+            'scenarios': {
+                name: harness.run_scenario(scenario, args.requests)
+                for name, scenario in scenarios.items()
+            },
+        }
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=args.keepdb
+        )
+    output = args.output or (
+        f'benchmarks/results/{PROJECT}-{results["commit"] or "local"}.json'
+    )
+    harness.write_results(output, results)
+    baseline = harness.load_results(args.compare) if args.compare else None
+    harness.print_results(results, baseline)
+    print(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
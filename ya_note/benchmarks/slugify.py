@@ -0,0 +1,63 @@
+"""Скорость транслитерации заголовков в slug.
+
+python -m benchmarks.slugify [--titles 1000000] [--distinct 50000]
+
+Заголовки — кириллические фразы из benchmarks.data, выбранные
+из --distinct различных, как при импорте с повторами. Сравниваются
+slugify из pytils на каждый заголовок, slugify_title с кэшем LRU
+и пакетный slugify_titles. База данных не нужна.
+"""
+import argparse
+import random
+from time import perf_counter
+
+from benchmarks import setup_django
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def measure(name, run, titles):
+    started = perf_counter()
+    slugs = run(titles)
+    elapsed = perf_counter() - started
+    print(f'{name:<14} {len(titles) / elapsed:>12,.0f} {elapsed:>8.2f}')
+    return slugs
+
+
+def main():
+    args = parse_args()
+    setup_django()
+    from pytils.translit import slugify
+
+    from benchmarks.data import sentence
+    from notes.slugs import slugify_stats, slugify_title, slugify_titles
+
+    rng = random.Random(args.seed)
+    distinct = [sentence(rng, 3)[:100] for _ in range(args.distinct)]
+    titles = [rng.choice(distinct) for _ in range(args.titles)]
+    print(f'{"вариант":<14} {"заголовков/с":>12} {"сек":>8}')
+    expected = measure(
+        'pytils', lambda titles: [slugify(title) for title in titles],
+        titles,
+    )
+    slugify_title.cache_clear()
+    cached = measure(
+        'slugify_title',
+        lambda titles: [slugify_title(title) for title in titles],
+        titles,
+    )
+    print(f'кэш: {slugify_stats()}')
+    slugify_title.cache_clear()
+    batch = measure('slugify_titles', slugify_titles, titles)
+    if not expected == cached == batch:
+        raise RuntimeError('Результаты вариантов расходятся.')
+
+
+if __name__ == '__main__':
+    main()
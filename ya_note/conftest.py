@@ -0,0 +1,23 @@
+import os
+
+import pytest
+from django.core.cache import caches
+from django.db import connections
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+    django_db_modify_db_settings_parallel_suffix
+):
+    """Своя база шарда при запуске через run_tests.py."""
+    name = os.environ.get('TEST_DB_NAME')
+    if name:
+        connections['default'].settings_dict['TEST']['NAME'] = name
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Кэш живёт в памяти процесса, а база откатывается после каждого
+    # теста: первичные ключи повторяются, и записи нужно сбрасывать.
+    for cache in caches.all():
+        cache.clear()
@@ -0,0 +1,156 @@
+"""Массовый импорт и экспорт заметок в формате JSON Lines."""
+import json
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate_notes
+from .forms import WARNING, NoteForm
+from .models import Note
+from .slugs import allocate_slugs
+
+EXPORT_FIELDS = ('title', 'text', 'slug')
+
+
+class NoteImportForm(NoteForm):
+    """NoteForm без запросов к базе на каждую строку.
+
+    Уникальность slug проверяется для всего пакета сразу в import_notes.
+    """
+
+    def clean_slug(self):
+        return self.cleaned_data.get('slug') or ''
+
+    def validate_unique(self):
+        pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line_number, errors):
+        self.errors.append({'line': line_number, 'errors': errors})
+
+
+def parse_lines(lines, result):
+    """Разбирает строки JSON Lines и проверяет их формой NoteImportForm.
+
+    Строки-байты декодируются как UTF-8; ошибки разбора, как и ошибки
+    формы, записываются в result по номеру строки. Возвращает пары
+    (номер строки, несохранённая заметка).
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError as error:
+                result.add_error(line_number, {'__all__': [str(error)]})
+                continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as error:
+            result.add_error(line_number, {'__all__': [str(error)]})
+            continue
+        if not isinstance(data, dict):
+            result.add_error(
+                line_number, {'__all__': ['Ожидается JSON-объект.']}
+            )
+            continue
+        form = NoteImportForm(data)
+        if not form.is_valid():
+            result.add_error(line_number, form.errors.get_json_data())
+            continue
+        yield line_number, form.save(commit=False)
+
+
+def resolve_slugs(batch, result):
+    """Проверяет явные slug и подбирает недостающие для всего пакета.
+
+    Возвращает тройки (номер строки, заметка, slug подобран автоматически).
+    """
+    explicit = [note.slug for _, note in batch if note.slug]
+    taken = set(
+        Note.objects.filter(slug__in=explicit).values_list('slug', flat=True)
+    )
+    resolved = []
+    for line_number, note in batch:
+        if not note.slug:
+            resolved.append((line_number, note, True))
+        elif note.slug in taken:
+            result.add_error(line_number, {'slug': [note.slug + WARNING]})
+        else:
+            taken.add(note.slug)
+            resolved.append((line_number, note, False))
+    generated = [note for _, note, auto in resolved if auto]
+    slugs = allocate_slugs(
+        Note, [note.title for note in generated], reserved=taken
+    )
+    for note, slug in zip(generated, slugs):
+        note.slug = slug
+    return resolved
+
+
+def save_batch(batch, result):
+    resolved = resolve_slugs(batch, result)
+    try:
+        with transaction.atomic():
+            Note.objects.bulk_create(note for _, note, _ in resolved)
+    except IntegrityError:
+        # slug успел занять параллельный запрос: сохраняем по одной,
+        # Note.save подберёт свободный вариант сам.
+        for line_number, note, auto in resolved:
+            if auto:
+                note.slug = ''
+            try:
+                with transaction.atomic():
+                    note.pk = None
+                    note.save()
+            except IntegrityError as error:
+                result.add_error(line_number, {'__all__': [str(error)]})
+                continue
+            result.created += 1
+        return
+    result.created += len(resolved)
+
+
+def import_notes(lines, author, batch_size=None):
+    """Импортирует заметки пользователя author из строк JSON Lines.
+
+    Строки читаются потоком и сохраняются пакетами через bulk_create,
+    поэтому расход памяти не зависит от размера входных данных.
+    bulk_create не отправляет post_save, поэтому кэш заметок автора
+    сбрасывается здесь, даже если импорт прервался.
+    """
+    batch_size = batch_size or settings.NOTES_IMPORT_BATCH_SIZE
+    result = ImportResult()
+    batch = []
+    try:
+        for line_number, note in parse_lines(lines, result):
+            note.author = author
+            batch.append((line_number, note))
+            if len(batch) >= batch_size:
+                save_batch(batch, result)
+                batch = []
+        if batch:
+            save_batch(batch, result)
+    finally:
+        invalidate_notes(author.pk)
+    return result
+
+
+def export_notes(author, chunk_size=None):
+    """Отдаёт заметки пользователя строками JSON Lines."""
+    chunk_size = chunk_size or settings.NOTES_IMPORT_BATCH_SIZE
+    notes = (
+        Note.objects.filter(author=author)
+        .order_by('pk')
+        .values(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for note in notes:
+        yield json.dumps(note, ensure_ascii=False) + '\n'
@@ -0,0 +1,138 @@
+"""Кэш заметок пользователя.
+
+Список заметок (id, title, slug) и сами заметки по slug хранятся
+в кэше NOTES_CACHE_ALIAS под ключами с версией пользователя. Любое
+изменение его заметок увеличивает версию (invalidate_notes), поэтому
+старые записи просто перестают запрашиваться, и бэкенд вытесняет их
+как давно не использованные. Заметки видит только их автор, а после
+правки он читает из основной базы (yacommon.replicas), поэтому кэш под
+новой версией не заполнится с отстающей реплики.
+
+Счётчики попаданий и промахов ведутся в памяти процесса (stats).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Note
+
+VERSION_KEY = 'notes:{user_pk}:version'
+INDEX_KEY = 'notes:{user_pk}:{version}:index'
+NOTE_KEY = 'notes:{user_pk}:{version}:note:{slug}'
+# Порядок полей — как в Note._meta.concrete_fields, этого ждёт from_db.
+INDEX_FIELDS = ('id', 'title', 'slug')
+NOTE_FIELDS = tuple(field.attname for field in Note._meta.concrete_fields)
+
+
+class CacheStats:
+    """Попадания и промахи кэша заметок в этом процессе."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+stats = CacheStats()
+
+
+def notes_cache():
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def initial_version():
+    """Начальная версия — текущее время в микросекундах.
+
+    Если ключ версии вытеснят из кэша, новая версия не совпадёт
+    ни с одной из выданных ранее.
+    """
+    return time.time_ns() // 1000
+
+
+def user_version(user_pk):
+    cache = notes_cache()
+    key = VERSION_KEY.format(user_pk=user_pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_pk):
+    cache = notes_cache()
+    key = VERSION_KEY.format(user_pk=user_pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, initial_version(), timeout=None)
+
+
+def invalidate_notes(user_pk):
+    """Сбрасывает кэш заметок пользователя.
+
+    Версия увеличивается ещё раз после фиксации транзакции: другой
+    запрос мог успеть закэшировать данные, прочитанные до неё.
+    """
+    bump_version(user_pk)
+    transaction.on_commit(lambda: bump_version(user_pk))
+
+
+def cached_rows(key, load):
+    cache = notes_cache()
+    rows = cache.get(key)
+    stats.record(rows is not None)
+    if rows is None:
+        rows = load()
+        if rows is not None:
+            cache.set(key, rows, settings.NOTES_CACHE_TIMEOUT)
+    return rows
+
+
+def note_index(user):
+    """Заметки пользователя в порядке pk, загружены только INDEX_FIELDS."""
+    key = INDEX_KEY.format(user_pk=user.pk, version=user_version(user.pk))
+    rows = cached_rows(key, lambda: list(
+        Note.objects.filter(author=user)
+        .order_by('pk')
+        .values_list(*INDEX_FIELDS)
+    ))
+    return [Note.from_db(Note.objects.db, INDEX_FIELDS, row) for row in rows]
+
+
+def get_note(user, slug):
+    """Заметка пользователя по slug или None, если её нет."""
+    key = NOTE_KEY.format(
+        user_pk=user.pk, version=user_version(user.pk), slug=slug
+    )
+    row = cached_rows(key, lambda: (
+        Note.objects.filter(author=user, slug=slug)
+        .values_list(*NOTE_FIELDS)
+        .first()
+    ))
+    if row is None:
+        return None
+    return Note.from_db(Note.objects.db, NOTE_FIELDS, row)
@@ -0,0 +1,35 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import import_notes
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки пользователя из файла JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл JSON Lines, «-» — стандартный ввод.'
+        )
+        parser.add_argument('--author', required=True, help='Имя автора.')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, path, author, batch_size, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=author)
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {author} не найден.')
+        # Байты: строки с ошибкой кодировки попадут в отчёт.
+        if path == '-':
+            result = import_notes(sys.stdin.buffer, author, batch_size)
+        else:
+            with open(path, 'rb') as lines:
+                result = import_notes(lines, author, batch_size)
+        for error in result.errors:
+            self.stderr.write(f'Строка {error["line"]}: {error["errors"]}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Создано заметок: {result.created}')
+        )
@@ -1,7 +1,11 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import allocate_slug
+
+# Сколько раз подбирать slug заново, если его успел занять параллельный
+# запрос.
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -27,12 +31,23 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated = models.DateTimeField('Изменена', auto_now=True)
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            self.slug = allocate_slug(type(self), self.title, self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug_taken = type(self).objects.filter(
+                    slug=self.slug
+                ).exclude(pk=self.pk).exists()
+                self.slug = ''
+                if not slug_taken or attempt == SLUG_ATTEMPTS:
+                    raise
@@ -0,0 +1,117 @@
+"""Полнотекстовый поиск по заметкам автора.
+
+На SQLite с FTS5 поиск идёт по виртуальной таблице notes_note_fts,
+которую поддерживают триггеры из миграции 0003_note_fts: результаты
+ранжируются bm25, а фрагменты текста подсвечиваются. Без FTS5
+используется медленный запасной вариант через icontains.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+FTS_TABLE = 'notes_note_fts'
+WORD = re.compile(r'\w+')
+# Служебные символы-маркеры для snippet(): их не бывает в тексте заметок.
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 16
+# Веса bm25 для столбцов title, text, author_id.
+BM25_WEIGHTS = (10.0, 1.0, 0.0)
+
+SEARCH_SQL = f'''
+    SELECT note.id, note.slug, note.title,
+           snippet({FTS_TABLE}, 1, %s, %s, '…', %s)
+    FROM {FTS_TABLE}
+    JOIN notes_note AS note ON note.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY bm25({FTS_TABLE}, {', '.join(map(str, BM25_WEIGHTS))})
+    LIMIT %s
+'''
+
+
+@dataclass
+class SearchResult:
+    pk: int
+    slug: str
+    title: str
+    snippet: str
+
+
+def build_match(query, author_id):
+    """Превращает пользовательский запрос в выражение MATCH.
+
+    Каждое слово ищется как префикс, слова объединяются через AND,
+    а условие по автору проверяется внутри индекса.
+    """
+    words = WORD.findall(query)
+    if not words:
+        return None
+    terms = ' AND '.join(f'"{word}"*' for word in words)
+    return f'author_id:"{author_id}" AND ({terms})'
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и заменяет маркеры на <mark>."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def search_fts(author, query, limit):
+    match = build_match(query, author.pk)
+    if match is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_SQL,
+            (MARK_START, MARK_END, SNIPPET_TOKENS, match, limit),
+        )
+        rows = cursor.fetchall()
+    return [
+        SearchResult(pk, slug, title, highlight(snippet))
+        for pk, slug, title, snippet in rows
+    ]
+
+
+def search_like(author, query, limit):
+    """Запасной поиск без FTS5: полный просмотр заметок автора."""
+    words = WORD.findall(query)
+    if not words:
+        return []
+    notes = Note.objects.filter(author=author).only('slug', 'title', 'text')
+    for word in words:
+        notes = notes.filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+    return [
+        SearchResult(
+            note.pk, note.slug, note.title,
+            escape(note.text[:SNIPPET_TOKENS * 8]),
+        )
+        for note in notes[:limit]
+    ]
+
+
+def search_notes(author, query, limit=50):
+    if connection.vendor == 'sqlite':
+        try:
+            return search_fts(author, query, limit)
+        except DatabaseError:
+            pass
+    return search_like(author, query, limit)
+
+
+def rebuild_index():
+    """Перестраивает FTS-индекс по таблице notes_note."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_notes
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_author_notes(sender, instance, **kwargs):
+    """Сбрасывает кэш заметок автора при любом их изменении."""
+    invalidate_notes(instance.author_id)
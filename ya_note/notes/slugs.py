@@ -0,0 +1,106 @@
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+DEFAULT_SLUG = 'note'
+# Запас длины под числовой суффикс вида «-123456».
+SUFFIX_RESERVE = 7
+# Сколько префиксов объединять в одно условие OR при пакетном подборе.
+PREFIXES_PER_QUERY = 200
+# Сколько последних заголовков помнит slugify_title.
+SLUGIFY_CACHE_SIZE = 10_000
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def slugify_title(title):
+    """Транслитерация pytils с памятью на последние заголовки.
+
+    slugify разбирает заголовок посимвольно на Python, а при импорте
+    заголовки часто повторяются.
+    """
+    return slugify(title)
+
+
+def slugify_titles(titles):
+    """Пакетный slugify_title: каждый различный заголовок — один раз."""
+    slugs = {}
+    for title in titles:
+        if title not in slugs:
+            slugs[title] = slugify_title(title)
+    return [slugs[title] for title in titles]
+
+
+def slugify_stats():
+    """Попадания, промахи и заполненность кэша slugify_title."""
+    info = slugify_title.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+    }
+
+
+def make_candidate(base, number, max_length):
+    """Slug с числовым суффиксом, укороченный до max_length."""
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def first_free_slug(base, taken, max_length):
+    """Первый свободный вариант: base, base-2, base-3, …"""
+    if base not in taken:
+        return base
+    number = 2
+    while make_candidate(base, number, max_length) in taken:
+        number += 1
+    return make_candidate(base, number, max_length)
+
+
+def make_base(slug, max_length):
+    return slug[:max_length] or DEFAULT_SLUG
+
+
+def allocate_slug(model, title, exclude_pk=None):
+    """Подбирает свободный slug по заголовку одним запросом к базе.
+
+    Все занятые варианты вида base, base-2, … начинаются с общего
+    префикса, поэтому достаточно одного запроса slug__startswith.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    base = make_base(slugify_title(title), max_length)
+    prefix = base[:max_length - SUFFIX_RESERVE]
+    queryset = model.objects.filter(slug__startswith=prefix)
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    taken = set(queryset.values_list('slug', flat=True))
+    return first_free_slug(base, taken, max_length)
+
+
+def allocate_slugs(model, titles, reserved=()):
+    """Пакетный вариант allocate_slug для списка заголовков.
+
+    Занятые slug для всех заголовков читаются общими запросами
+    по PREFIXES_PER_QUERY префиксов, reserved — уже выданные
+    в этом пакете значения. Возвращает slug в порядке titles.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    bases = [make_base(slug, max_length) for slug in slugify_titles(titles)]
+    prefixes = sorted({base[:max_length - SUFFIX_RESERVE] for base in bases})
+    taken = set(reserved)
+    for start in range(0, len(prefixes), PREFIXES_PER_QUERY):
+        chunk = prefixes[start:start + PREFIXES_PER_QUERY]
+        condition = reduce(
+            or_, (Q(slug__startswith=prefix) for prefix in chunk)
+        )
+        taken.update(
+            model.objects.filter(condition).values_list('slug', flat=True)
+        )
+    slugs = []
+    for base in bases:
+        slug = first_free_slug(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,84 @@
+"""Массовое создание объектов для тестов.
+
+Функции вставляют объекты одним запросом на модель и возвращают их
+с заполненными pk. Время updated задаётся при вставке: auto_now
+при такой вставке не срабатывает. Поисковый индекс заметок
+поддерживают триггеры базы, кэш заметок сбрасывается здесь же.
+"""
+from datetime import timedelta
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from notes.cache import invalidate_notes
+from notes.models import Note
+
+# Сквозная нумерация, чтобы имена и slug не повторялись.
+sequence = count(1)
+
+
+def insert(model, objects):
+    """Вставляет объекты одним executemany, минуя компилятор запросов.
+
+    Первичные ключи назначаются заранее, следом за текущим
+    максимальным: executemany их не возвращает. save() и pre_save
+    не вызываются, поэтому auto_now не действует — время задаётся
+    в самих объектах.
+    """
+    meta = model._meta
+    fields = meta.concrete_fields
+    # Само соединение, а не прокси django.db.connection: к нему
+    # обращаются на каждое значение.
+    db = connections[DEFAULT_DB_ALIAS]
+    last = model.objects.aggregate(last=Max('pk'))['last'] or 0
+    for pk, obj in enumerate(objects, start=last + 1):
+        obj.pk = pk
+        obj._state.adding = False
+        obj._state.db = db.alias
+    quote = db.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with db.cursor() as cursor:
+        cursor.executemany(sql, [
+            [
+                field.get_db_prep_save(getattr(obj, field.attname), db)
+                for field in fields
+            ]
+            for obj in objects
+        ])
+    return objects
+
+
+def make_users(number, prefix='user'):
+    User = get_user_model()
+    return insert(User, [
+        User(username=f'{prefix}-{next(sequence)}') for _ in range(number)
+    ])
+
+
+def make_notes(author, number, start=None, step=timedelta(minutes=1),
+               title='Заметка {index}', text='Текст заметки {index}.'):
+    """Заметки author в количестве number с уникальными slug.
+
+    updated идёт от start назад с шагом step: первая заметка —
+    самая свежая.
+    """
+    start = start or timezone.now()
+    notes = insert(Note, [
+        Note(
+            title=title.format(index=index),
+            text=text.format(index=index),
+            slug=f'note-{next(sequence)}',
+            author_id=author.pk,
+            updated=start - step * index,
+        )
+        for index in range(number)
+    ])
+    invalidate_notes(author.pk)
+    return notes
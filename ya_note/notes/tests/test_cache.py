@@ -0,0 +1,126 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.cache import get_note, stats
+from notes.models import Note
+
+User = get_user_model()
+
+LIST_URL = reverse('notes:list')
+
+
+class TestNotesCache(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст заметки',
+            slug='note-slug',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        # Без conftest (manage.py test) кэш переживает откат базы,
+        # а ключи с первичными ключами повторяются.
+        for cache in caches.all():
+            cache.clear()
+        stats.reset()
+        self.addCleanup(stats.reset)
+
+    def titles(self):
+        response = self.author_client.get(LIST_URL)
+        return [note.title for note in response.context['object_list']]
+
+    def test_list_and_detail_are_cached(self):
+        detail_url = reverse('notes:detail', args=(self.note.slug,))
+        for url in (LIST_URL, detail_url):
+            with self.subTest(url=url):
+                self.author_client.get(url)
+                # Только сессия и пользователь.
+                with self.assertNumQueries(2):
+                    self.author_client.get(url)
+        self.assertEqual(stats.snapshot()['hits'], 2)
+        self.assertEqual(stats.snapshot()['misses'], 2)
+
+    def test_views_invalidate_cache(self):
+        self.assertEqual(self.titles(), ['Заголовок'])
+        steps = (
+            (
+                reverse('notes:add'),
+                {'title': 'Новая', 'text': 'Текст', 'slug': 'new'},
+                ['Заголовок', 'Новая'],
+            ),
+            (
+                reverse('notes:edit', args=(self.note.slug,)),
+                {'title': 'Изменена', 'text': 'Текст', 'slug': 'note-slug'},
+                ['Изменена', 'Новая'],
+            ),
+            (reverse('notes:delete', args=('new',)), {}, ['Изменена']),
+        )
+        for url, data, titles in steps:
+            with self.subTest(url=url):
+                self.author_client.post(url, data=data)
+                self.assertEqual(self.titles(), titles)
+
+    def test_import_invalidates_cache(self):
+        self.titles()
+        self.author_client.post(
+            reverse('notes:import'),
+            data=json.dumps({'title': 'Импорт', 'text': 'Текст'}),
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(self.titles(), ['Заголовок', 'Импорт'])
+
+    def test_import_command_invalidates_cache(self):
+        self.titles()
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.jsonl', encoding='utf-8'
+        ) as lines:
+            lines.write(json.dumps({'title': 'Из файла', 'text': 'Текст'}))
+            lines.flush()
+            call_command(
+                'import_notes', lines.name,
+                author=self.author.username, stdout=StringIO(),
+            )
+        self.assertEqual(self.titles(), ['Заголовок', 'Из файла'])
+
+    def test_other_users_notes_are_not_served(self):
+        reader = User.objects.create(username='Читатель простой')
+        get_note(self.author, self.note.slug)
+        self.assertIsNone(get_note(reader, self.note.slug))
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'notes': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-lru',
+            'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 4},
+        },
+    })
+    def test_least_recently_used_note_is_evicted(self):
+        for slug in ('a', 'b', 'c', 'd'):
+            Note.objects.create(
+                title=slug, text='Текст', slug=slug, author=self.author
+            )
+        # Версия пользователя и заметки a, b; a затем читается снова.
+        for slug in ('a', 'b', 'a', 'c', 'd'):
+            get_note(self.author, slug)
+        stats.reset()
+        get_note(self.author, 'a')
+        get_note(self.author, 'b')
+        self.assertEqual(stats.snapshot(), {
+            'hits': 1, 'misses': 1, 'hit_ratio': 0.5,
+        })
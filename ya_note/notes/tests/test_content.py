@@ -3,6 +3,7 @@ from django.test import TestCase, Client
 from django.urls import reverse
 
 from notes.models import Note
+from notes.tests.factories import make_notes
 
 User = get_user_model()
 
@@ -36,6 +37,11 @@ class TestNoteList(SetUpTestCase):
                 object_list = client.get(url).context['object_list']
                 self.assertEqual(self.note in object_list, value)
 
+    def test_list_does_not_load_text(self):
+        response = self.author_client.get(reverse('notes:list'))
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
     def test_pages_contains_form(self):
         urls = (
             ('notes:add', None),
@@ -47,3 +53,56 @@ class TestNoteList(SetUpTestCase):
                 self.client.force_login(self.author)
                 response = self.client.get(url)
                 self.assertIn('form', response.context)
+
+
+class TestNoteSearch(SetUpTestCase):
+    URL = reverse('notes:search')
+
+    def search(self, client, query):
+        return client.get(self.URL, {'q': query}).context['results']
+
+    def test_search_is_scoped_to_author(self):
+        Note.objects.create(
+            title='Чужая', text='Текст заметки читателя',
+            slug='reader-note', author=self.reader,
+        )
+        results = self.search(self.author_client, 'текст')
+        self.assertEqual([result.pk for result in results], [self.note.pk])
+        self.assertIn('<mark>Текст</mark>', results[0].snippet)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.note.text = 'Совсем другое содержание'
+        self.note.save()
+        self.assertEqual(self.search(self.author_client, 'текст'), [])
+        self.assertEqual(len(self.search(self.author_client, 'содерж')), 1)
+        self.note.delete()
+        self.assertEqual(self.search(self.author_client, 'содерж'), [])
+
+
+class TestLargeNoteSet(TestCase):
+    NOTES_COUNT = 10_000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        *_, cls.last_note = make_notes(cls.author, cls.NOTES_COUNT)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_list_contains_all_notes(self):
+        object_list = self.client.get(reverse('notes:list')).context[
+            'object_list'
+        ]
+        self.assertEqual(len(object_list), self.NOTES_COUNT)
+
+    def test_search_finds_note_among_all(self):
+        results = self.client.get(
+            reverse('notes:search'), {'q': 'Заметка 9999'}
+        ).context['results']
+        self.assertEqual(results[0].pk, self.last_note.pk)
+
+    def test_export_streams_all_notes(self):
+        response = self.client.get(reverse('notes:export'))
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), self.NOTES_COUNT)
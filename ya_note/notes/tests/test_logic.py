@@ -1,10 +1,13 @@
+import json
 from http import HTTPStatus
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import slugify_stats, slugify_title, slugify_titles
 from pytils.translit import slugify
 
 User = get_user_model()
@@ -15,6 +18,8 @@ EDIT_URL = reverse('notes:edit', args=(SLUG,))
 ADD_URL = reverse('notes:add')
 DELETE_URL = reverse('notes:delete', args=(SLUG,))
 SUCCESS_URL = reverse('notes:success')
+IMPORT_URL = reverse('notes:import')
+EXPORT_URL = reverse('notes:export')
 
 
 class TestNews(TestCase):
@@ -64,6 +69,59 @@ class TestNews(TestCase):
         self.assertEqual(note.slug, expected_slug)
 
 
+class TestSlugAllocation(TestCase):
+    TITLE = 'Заметка без slug'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testUser')
+        cls.base_slug = slugify(cls.TITLE)
+        Note.objects.create(title=cls.TITLE, text='Текст', author=cls.user)
+
+    def test_collisions_get_numbered_suffix(self):
+        Note.objects.create(
+            title=self.TITLE, text='Текст', author=self.user,
+            slug=f'{self.base_slug}-2',
+        )
+        # Один SELECT на подбор slug и INSERT внутри точки сохранения.
+        with self.assertNumQueries(4):
+            note = Note.objects.create(
+                title=self.TITLE, text='Текст', author=self.user
+            )
+        self.assertEqual(note.slug, f'{self.base_slug}-3')
+
+    def test_form_without_slug_gets_free_slug(self):
+        self.client.force_login(self.user)
+        form_data = {'title': self.TITLE, 'text': 'Текст'}
+        response = self.client.post(ADD_URL, data=form_data)
+        self.assertRedirects(response, SUCCESS_URL)
+        self.assertTrue(
+            Note.objects.filter(slug=f'{self.base_slug}-2').exists()
+        )
+
+    def test_retry_when_slug_taken_concurrently(self):
+        with mock.patch(
+            'notes.models.allocate_slug',
+            side_effect=(self.base_slug, 'free-slug'),
+        ):
+            note = Note.objects.create(
+                title=self.TITLE, text='Текст', author=self.user
+            )
+        self.assertEqual(note.slug, 'free-slug')
+
+    def test_batch_slugify_reuses_cache(self):
+        slugify_title.cache_clear()
+        self.addCleanup(slugify_title.cache_clear)
+        titles = ['Первая заметка', 'Вторая', 'Первая заметка']
+        self.assertEqual(
+            slugify_titles(titles), [slugify(title) for title in titles]
+        )
+        slugify_title('Вторая')
+        stats = slugify_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+        self.assertEqual(stats['size'], 2)
+
+
 class TestNotesEditDelete(TestCase):
     NOTE_TITLE = 'title'
     NEW_NOTE_TITLE = 'updated title'
@@ -113,3 +171,79 @@ class TestNotesEditDelete(TestCase):
         response = self.reader_client.post(self.delete_note_url)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(Note.objects.count(), 1)
+
+
+class TestBulkImportExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='testUser')
+        cls.other = User.objects.create(username='otherUser')
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='taken', author=cls.other
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_lines(self, *lines):
+        return self.client.post(
+            IMPORT_URL,
+            data='\n'.join(lines).encode(),
+            content_type='application/x-ndjson',
+        )
+
+    def test_import_creates_notes_and_reports_errors(self):
+        lines = [
+            json.dumps({'title': 'Один', 'text': 'Текст', 'slug': 'one'}),
+            json.dumps({'title': 'Дубль', 'text': 'Текст'}),
+            json.dumps({'title': 'Дубль', 'text': 'Текст'}),
+            json.dumps({'title': 'Занято', 'text': 'Текст', 'slug': 'taken'}),
+            json.dumps({'title': 'Без текста'}),
+            'не json',
+        ]
+        with self.settings(NOTES_IMPORT_BATCH_SIZE=2):
+            response = self.post_lines(*lines)
+        result = response.json()
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(
+            [error['line'] for error in result['errors']], [4, 5, 6]
+        )
+        self.assertEqual(
+            sorted(
+                Note.objects.filter(author=self.user)
+                .values_list('slug', flat=True)
+            ),
+            ['dubl', 'dubl-2', 'one'],
+        )
+
+    def test_import_reports_invalid_utf8(self):
+        response = self.client.post(
+            IMPORT_URL,
+            data=b'\xff\xfe\n' + json.dumps(
+                {'title': 'Один', 'text': 'Текст'}
+            ).encode(),
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        result = response.json()
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['line'] for error in result['errors']], [1])
+
+    def test_anonymous_cant_import(self):
+        self.client.logout()
+        response = self.post_lines(json.dumps({'title': 'Т', 'text': 'Т'}))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_export_streams_only_own_notes(self):
+        Note.objects.create(
+            title='Моя', text='Текст', slug='mine', author=self.user
+        )
+        response = self.client.get(EXPORT_URL)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'title': 'Моя', 'text': 'Текст', 'slug': 'mine'}],
+        )
@@ -0,0 +1,64 @@
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from yacommon.performance import PerformanceBudgetExceeded, registry
+
+User = get_user_model()
+
+
+class TestPerformanceMiddleware(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+
+    def setUp(self):
+        stats_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(stats_dir.cleanup)
+        monitoring = override_settings(
+            PERFORMANCE_MONITORING=True,
+            PERFORMANCE_STATS_DIR=stats_dir.name,
+        )
+        monitoring.enable()
+        self.addCleanup(monitoring.disable)
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.client.force_login(self.author)
+
+    def test_metrics_are_recorded_per_url_name(self):
+        response = self.client.get(reverse('notes:list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        stats = registry.snapshot()['notes:list']
+        self.assertEqual(stats['count'], 1)
+        self.assertGreaterEqual(stats['queries'], 1)
+
+    def test_budget_violation_raises(self):
+        with self.settings(
+            PERFORMANCE_BUDGETS={'notes:list': {'queries': 0}},
+            PERFORMANCE_BUDGET_ACTION='raise',
+        ):
+            with self.assertRaises(PerformanceBudgetExceeded):
+                self.client.get(reverse('notes:list'))
+
+    def test_stats_command_reads_dumped_stats(self):
+        self.client.get(reverse('notes:list'))
+        registry.dump()
+        out = StringIO()
+        call_command('performance_stats', stdout=out)
+        self.assertIn('notes:list', out.getvalue())
+
+    @override_settings(PERFORMANCE_TEMPLATE_PROFILING=True)
+    def test_template_profiling_covers_includes(self):
+        self.client.get(reverse('notes:add'))
+        templates = registry.snapshot()['notes:add']['templates']
+        self.assertLessEqual(
+            {'notes/form.html', 'base.html', 'includes/header.html'},
+            set(templates),
+        )
+        form = templates['notes/form.html']
+        self.assertEqual(form['count'], 1)
+        self.assertLess(form['self_ms'], form['total_ms'])
@@ -0,0 +1,53 @@
+import re
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from notes import views
+from notes.models import Note
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+$')
+
+
+@skipIf(connection.vendor != 'sqlite', 'Планы запросов SQLite.')
+class TestQueryPlans(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст заметки',
+            slug='note-slug',
+            author=cls.author,
+        )
+
+    def assert_no_full_scan(self, queryset):
+        plan = queryset.explain()
+        full_scans = [
+            line for line in plan.splitlines()
+            if FULL_SCAN.search(line.strip())
+        ]
+        self.assertFalse(full_scans, f'Полный просмотр таблицы:\n{plan}')
+
+    def make_view(self, view_class, **kwargs):
+        request = RequestFactory().get('/')
+        request.user = self.author
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view
+
+    def test_views_querysets_use_index(self):
+        for view_class in (
+            views.NotesList, views.NoteDetail,
+            views.NoteUpdate, views.NoteDelete,
+        ):
+            with self.subTest(view=view_class.__name__):
+                view = self.make_view(view_class, slug=self.note.slug)
+                queryset = view.get_queryset()
+                self.assert_no_full_scan(queryset)
+                self.assert_no_full_scan(queryset.filter(slug=self.note.slug))
@@ -0,0 +1,101 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from yacommon.management.commands.replicate import copy_database
+from yacommon.replicas import STICKY_COOKIE
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+def notes_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if '"notes_' in query['sql']
+    ]
+
+
+@override_settings(
+    READ_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=30
+)
+class TestReplicaRouting(TransactionTestCase):
+    # В тестах реплика — зеркало default (TEST MIRROR) с отдельным
+    # соединением, поэтому данные должны быть закоммичены.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.author = User.objects.create(username='Лев Толстой')
+        self.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст заметки',
+            slug='note-slug',
+            author=self.author,
+        )
+        self.client.force_login(self.author)
+
+    def read_queries(self, url):
+        """SQL к таблицам notes, ушедшие в основную базу и в реплику."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(url)
+        return response, notes_queries(primary), notes_queries(replica)
+
+    def test_reads_go_to_replica(self):
+        urls = (
+            reverse('notes:list'),
+            reverse('notes:detail', args=(self.note.slug,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, primary, replica = self.read_queries(url)
+                self.assertContains(response, self.note.title)
+                self.assertEqual(primary, [])
+                self.assertNotEqual(replica, [])
+
+    def test_writer_sticks_to_primary(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.post(
+                reverse('notes:edit', args=(self.note.slug,)),
+                data={'title': 'Новый', 'text': 'Текст', 'slug': 'note-slug'},
+            )
+        self.assertEqual(notes_queries(replica), [])
+        self.assertEqual(response.cookies[STICKY_COOKIE]['max-age'], 30)
+        response, primary, replica = self.read_queries(
+            reverse('notes:detail', args=(self.note.slug,))
+        )
+        self.assertContains(response, 'Новый')
+        self.assertNotEqual(primary, [])
+        self.assertEqual(replica, [])
+
+
+class TestReplicate(TestCase):
+
+    def test_copy_database(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = Path(directory.name) / 'source.db'
+        target = Path(directory.name) / 'target.db'
+        with sqlite3.connect(source) as db:
+            db.execute('CREATE TABLE notes (title TEXT)')
+            db.execute("INSERT INTO notes VALUES ('Заголовок')")
+        db.close()
+        reader = sqlite3.connect(target)
+        self.addCleanup(reader.close)
+        copy_database(source, target)
+        # Уже открытое соединение с репликой видит свежую копию.
+        self.assertEqual(
+            reader.execute('SELECT title FROM notes').fetchall(),
+            [('Заголовок',)],
+        )
+
+    def test_replicate_requires_replicas(self):
+        with self.assertRaises(CommandError):
+            call_command('replicate', verbosity=0)
@@ -64,3 +64,16 @@ class TestRoutes(TestCase):
                 redirect_url = f'{login_url}?next={url}'
                 response = self.client.get(url)
                 self.assertRedirects(response, redirect_url)
+
+    def test_detail_not_modified_until_note_changes(self):
+        self.client.force_login(self.author)
+        url = reverse('notes:detail', args=(self.note.slug,))
+        etag = self.client.get(url)['ETag']
+        # Сессия и пользователь; заметка уже в кэше.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.note.text = 'Новый текст'
+        self.note.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
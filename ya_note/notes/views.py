@@ -1,9 +1,16 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
+from yacommon.replicas import primary_after_write, read_from_replica
 
+from .bulk import export_notes, import_notes
+from .cache import get_note, note_index
 from .forms import NoteForm
 from .models import Note
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -26,6 +33,7 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
+@method_decorator(primary_after_write, name='dispatch')
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
@@ -38,22 +46,116 @@ class NoteCreate(NoteBase, generic.CreateView):
         return super().form_valid(form)
 
 
+@method_decorator(primary_after_write, name='dispatch')
 class NoteUpdate(NoteBase, generic.UpdateView):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
 
+@method_decorator(primary_after_write, name='dispatch')
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
 
+@method_decorator(read_from_replica, name='dispatch')
 class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_context_data(self, **kwargs):
+        """Список берётся из кэша заметок пользователя.
 
+        note_index загружает только INDEX_FIELDS, без текста.
+        """
+        return super().get_context_data(
+            object_list=note_index(self.request.user), **kwargs
+        )
+
+
+def cached_note(request, slug):
+    """Заметка пользователя из кэша или None.
+
+    Результат запоминается на запросе: ETag, Last-Modified и сама
+    страница обходятся одним обращением к кэшу.
+    """
+    if not request.user.is_authenticated:
+        return None
+    if not hasattr(request, 'cached_note'):
+        request.cached_note = get_note(request.user, slug)
+    return request.cached_note
+
+
+def note_version(request, slug):
+    """Пара (pk, updated) заметки."""
+    note = cached_note(request, slug)
+    return note and (note.pk, note.updated)
+
+
+def note_etag(request, slug):
+    version = note_version(request, slug)
+    if version is None:
+        return None
+    pk, updated = version
+    return f'{pk}-{updated.timestamp()}'
+
+
+def note_last_modified(request, slug):
+    version = note_version(request, slug)
+    return version and version[1]
+
+
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_last_modified),
+    name='dispatch',
+)
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        note = cached_note(self.request, self.kwargs['slug'])
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
+
+class NotesSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['results'] = (
+            search_notes(self.request.user, query) if query else []
+        )
+        return context
+
+
+@method_decorator(primary_after_write, name='dispatch')
+class NotesImport(LoginRequiredMixin, generic.View):
+    """Импорт заметок из тела запроса в формате JSON Lines."""
+
+    def post(self, request, *args, **kwargs):
+        result = import_notes(request, request.user)
+        return JsonResponse(
+            {'created': result.created, 'errors': result.errors}
+        )
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Потоковая выгрузка заметок пользователя в формате JSON Lines."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(request.user),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.jsonl"'
+        )
+        return response
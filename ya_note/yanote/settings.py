@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общая инфраструктура проектов (yacommon) лежит в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -18,10 +21,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.YacommonConfig',
     'notes.apps.NotesConfig'
 ]
 
 MIDDLEWARE = [
+    'yacommon.performance.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,9 +61,50 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Реплика для чтения: копия db.sqlite3, которую обновляет
+    # manage.py replicate. В тестах — та же база, что и default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['yacommon.replicas.ReplicaRouter']
+# Псевдонимы реплик, с которых читают список и страница заметки
+# (yacommon.replicas); пустой список — всё читается из default.
+READ_REPLICAS = []
+# Приложения, модели которых читаются с реплик.
+REPLICA_APPS = ['notes']
+# Сколько секунд после записи браузер читает только из default.
+REPLICA_STICKY_SECONDS = 10
+
+# Кэш заметок пользователя (notes.cache). LocMemCache вытесняет давно
+# не использованные записи, при CULL_FREQUENCY, равном MAX_ENTRIES, —
+# по одной. С несколькими процессами нужен общий бэкенд.
+NOTES_CACHE_ALIAS = 'notes'
+NOTES_CACHE_MAX_ENTRIES = 10_000
+NOTES_CACHE_TIMEOUT = 60 * 60
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote',
+    },
+    NOTES_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote-notes',
+        'OPTIONS': {
+            'MAX_ENTRIES': NOTES_CACHE_MAX_ENTRIES,
+            'CULL_FREQUENCY': NOTES_CACHE_MAX_ENTRIES,
+        },
+    },
 }
 
+# PRAGMA для каждого нового соединения SQLite, см. settings_production.py.
+SQLITE_PRAGMAS = {}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +133,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Размер пакета bulk_create при массовом импорте и выгрузке заметок.
+NOTES_IMPORT_BATCH_SIZE = 500
+
+# Учёт SQL-запросов и времени ответа по именам URL (yacommon.performance).
+PERFORMANCE_MONITORING = False
+PERFORMANCE_STATS_DIR = BASE_DIR / 'performance_stats'
+PERFORMANCE_DUMP_EVERY = 100
+# Время отрисовки по каждому шаблону (включая include); заметно
+# дороже остального учёта, включать на время разбора.
+PERFORMANCE_TEMPLATE_PROFILING = False
+# Например: {'notes:list': {'queries': 3, 'total_ms': 200}}.
+PERFORMANCE_BUDGETS = {}
+# 'log' — предупреждение в лог, 'raise' — исключение.
+PERFORMANCE_BUDGET_ACTION = 'log'
@@ -0,0 +1,13 @@
+"""Боевой профиль: DJANGO_SETTINGS_MODULE=yanote.settings_production.
+
+SQLite, шаблоны и соединения настраивает yacommon.production.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES, TEMPLATES
+
+# yacommon импортируется после .settings: тот добавляет его в sys.path.
+from yacommon.production import SQLITE_PRAGMAS, configure  # noqa: F401
+
+DEBUG = False
+
+configure(TEMPLATES, DATABASES)
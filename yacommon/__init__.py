@@ -0,0 +1,11 @@
+"""Общая инфраструктура проектов YaNews и YaNote.
+
+Приложение Django: его подключают оба проекта (INSTALLED_APPS),
+а каталог репозитория добавляет в sys.path settings.py проекта.
+
+- performance: учёт запросов и времени ответа, команда
+  performance_stats;
+- replicas: чтение с реплик базы, команда replicate;
+- db_backend и production: SQLite для боевого профиля;
+- harness: общие средства нагрузочных сценариев.
+"""
@@ -0,0 +1,15 @@
+"""SQLite с транзакциями BEGIN IMMEDIATE.
+
+Django 3.2 открывает транзакции как BEGIN (DEFERRED): транзакция,
+которая сначала читает, а потом пишет, при конкурентной записи сразу
+получает «database is locked» — busy_timeout в этом случае не
+помогает. BEGIN IMMEDIATE берёт блокировку записи в начале
+транзакции, и конкурирующие писатели честно ждут её в busy_timeout.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
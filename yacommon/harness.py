@@ -0,0 +1,107 @@
+"""Общие средства нагрузочных сценариев.
+
+Сценарий — функция без аргументов, выполняющая один HTTP-запрос
+через тестовый клиент Django и возвращающая ответ.
+"""
+import json
+import os
+import statistics
+import subprocess
+import tracemalloc
+from time import perf_counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PERCENTILES = (50, 95, 99)
+MEMORY_SAMPLES = 10
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run_scenario(scenario, requests, warmup=5):
+    """Прогоняет сценарий и возвращает сводку по задержкам и памяти.
+
+    Задержки меряются без tracemalloc, пиковая память — отдельным
+    коротким прогоном, чтобы трассировка не искажала время.
+    """
+    for _ in range(warmup):
+        scenario()
+    latencies = []
+    queries = []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = perf_counter()
+            response = scenario()
+            latencies.append((perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'Сценарий вернул {response.status_code}: {response}'
+            )
+        queries.append(len(captured))
+    tracemalloc.start()
+    for _ in range(min(requests, MEMORY_SAMPLES)):
+        scenario()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        'requests': requests,
+        'mean_ms': statistics.fmean(latencies),
+        'queries_per_request': statistics.fmean(queries),
+        'max_queries': max(queries),
+        'peak_memory_kb': peak / 1024,
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = percentile(latencies, percent)
+    return result
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, indent=2, ensure_ascii=False)
+
+
+def print_results(results, baseline=None):
+    """Печатает таблицу сценариев, а с baseline — изменение p95."""
+    header = (
+        f'{"сценарий":<16} {"p50":>8} {"p95":>8} {"p99":>8} '
+        f'{"sql/req":>8} {"память КБ":>10}'
+    )
+    if baseline:
+        header += f' {"Δp95":>8}'
+    print(header)
+    for name, result in results['scenarios'].items():
+        line = (
+            f'{name:<16} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} '
+            f'{result["p99_ms"]:>8.2f} {result["queries_per_request"]:>8.1f} '
+            f'{result["peak_memory_kb"]:>10.0f}'
+        )
+        previous = baseline and baseline['scenarios'].get(name)
+        if previous and previous['p95_ms']:
+            change = result['p95_ms'] / previous['p95_ms'] - 1
+            line += f' {change:>+8.0%}'
+        print(line)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as results_file:
+        return json.load(results_file)
@@ -0,0 +1,78 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yacommon.performance import load_stats, percentile, slowest_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит сводку PerformanceMiddleware по именам URL: число '
+        'запросов, SQL, время шаблонов и перцентили времени ответа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', default=None,
+            help='Каталог со статистикой (PERFORMANCE_STATS_DIR).',
+        )
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument(
+            '--templates', type=int, default=0, metavar='N',
+            help='Показать N самых медленных шаблонов каждого URL.',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить накопленные файлы после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PERFORMANCE_STATS_DIR
+        stats = load_stats(directory)
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+        else:
+            self.write_table(stats)
+            if options['templates']:
+                self.write_templates(stats, options['templates'])
+        if options['reset'] and os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.startswith('stats-'):
+                    os.remove(os.path.join(directory, name))
+
+    def write_table(self, stats):
+        self.stdout.write(
+            f'{"url":<20} {"n":>7} {"sql/req":>8} {"sql мс":>8} '
+            f'{"tpl мс":>8} {"p50":>6} {"p95":>6} {"p99":>6} {"max":>8}'
+        )
+        for view_name, view_stats in sorted(stats.items()):
+            count = view_stats['count'] or 1
+            self.stdout.write(
+                f'{view_name:<20} {view_stats["count"]:>7} '
+                f'{view_stats["queries"] / count:>8.1f} '
+                f'{view_stats["sql_ms"] / count:>8.1f} '
+                f'{view_stats["template_ms"] / count:>8.1f} '
+                f'{percentile(view_stats, 0.5):>6.0f} '
+                f'{percentile(view_stats, 0.95):>6.0f} '
+                f'{percentile(view_stats, 0.99):>6.0f} '
+                f'{view_stats["max_total_ms"]:>8.1f}'
+            )
+
+    def write_templates(self, stats, limit):
+        for view_name, view_stats in sorted(stats.items()):
+            templates = slowest_templates(view_stats, limit)
+            if not templates:
+                continue
+            self.stdout.write(f'\n{view_name}')
+            self.stdout.write(
+                f'  {"шаблон":<30} {"раз/req":>8} {"всего мс":>9} '
+                f'{"своё мс":>8}'
+            )
+            for name, template_stats in templates:
+                self.stdout.write(
+                    f'  {name:<30} {template_stats["count"]:>8.1f} '
+                    f'{template_stats["total_ms"]:>9.2f} '
+                    f'{template_stats["self_ms"]:>8.2f}'
+                )
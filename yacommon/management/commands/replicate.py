@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    """Копирует базу SQLite source в target через backup API.
+
+    Копия согласована, даже если в source в это время пишут, а
+    открытые соединения с target увидят новые данные, как после
+    обычной транзакции.
+    """
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики READ_REPLICAS — '
+        'заменитель репликации для локального запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', type=float, metavar='SECONDS',
+            help='Повторять копирование с таким интервалом, изображая '
+                 'отставание реплик.',
+        )
+
+    def handle(self, *args, loop, verbosity, **options):
+        aliases = (DEFAULT_DB_ALIAS, *settings.READ_REPLICAS)
+        if len(aliases) == 1:
+            raise CommandError('Реплики не заданы (READ_REPLICAS).')
+        if any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError('Копировать можно только базы SQLite.')
+        source, *targets = [
+            str(connections[alias].settings_dict['NAME']) for alias in aliases
+        ]
+        while True:
+            for target in targets:
+                copy_database(source, target)
+            if verbosity:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Обновлено реплик: {len(targets)}')
+                )
+            if not loop:
+                break
+            time.sleep(loop)
@@ -0,0 +1,330 @@
+"""Учёт запросов к базе и времени ответа по именам URL.
+
+PerformanceMiddleware включается настройкой PERFORMANCE_MONITORING.
+Для каждого запроса она считает SQL-запросы, их суммарное время,
+время отрисовки шаблона и общее время ответа, отдаёт их в заголовке
+Server-Timing и копит гистограммы в памяти процесса. Гистограммы
+периодически сбрасываются в PERFORMANCE_STATS_DIR (файл на процесс),
+откуда их читает команда performance_stats.
+
+С PERFORMANCE_TEMPLATE_PROFILING время отрисовки копится ещё и по
+каждому шаблону, включая подключаемые через include и extends:
+общее время и собственное, без вложенных шаблонов.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы времени ответа, мс.
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+METRICS = ('queries', 'sql_ms', 'template_ms', 'total_ms')
+TEMPLATE_METRICS = ('count', 'total_ms', 'self_ms')
+
+# Показатели текущего запроса для профилировщика шаблонов.
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class PerformanceBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    """Показатели одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.total_ms = 0.0
+        self.templates = {}
+        self._template_started = None
+        self._nested_ms = []
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_ms += (perf_counter() - started) * 1000
+
+    def template_started(self):
+        self._template_started = perf_counter()
+
+    def template_finished(self, response=None):
+        if self._template_started is not None:
+            self.template_ms += (
+                perf_counter() - self._template_started
+            ) * 1000
+            self._template_started = None
+
+    def enter_template(self):
+        self._nested_ms.append(0.0)
+
+    def exit_template(self, name, elapsed_ms):
+        nested_ms = self._nested_ms.pop()
+        if self._nested_ms:
+            self._nested_ms[-1] += elapsed_ms
+        stats = self.templates.setdefault(
+            name, dict.fromkeys(TEMPLATE_METRICS, 0)
+        )
+        stats['count'] += 1
+        stats['total_ms'] += elapsed_ms
+        stats['self_ms'] += elapsed_ms - nested_ms
+
+    def as_dict(self):
+        return {metric: getattr(self, metric) for metric in METRICS}
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ))
+
+
+def empty_stats():
+    return {
+        'count': 0,
+        **{metric: 0.0 for metric in METRICS},
+        **{f'max_{metric}': 0.0 for metric in METRICS},
+        'histogram': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+        'templates': {},
+    }
+
+
+def merge_templates(target, source):
+    for name, template_stats in source.items():
+        merged = target.setdefault(
+            name, dict.fromkeys(TEMPLATE_METRICS, 0)
+        )
+        for metric in TEMPLATE_METRICS:
+            merged[metric] += template_stats[metric]
+
+
+def bucket_index(total_ms):
+    for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+        if total_ms <= bound:
+            return index
+    return len(HISTOGRAM_BUCKETS_MS)
+
+
+def merge_stats(target, source):
+    """Складывает статистику source в target (для файлов разных процессов)."""
+    target['count'] += source['count']
+    for metric in METRICS:
+        target[metric] += source[metric]
+        target[f'max_{metric}'] = max(
+            target[f'max_{metric}'], source[f'max_{metric}']
+        )
+    target['histogram'] = [
+        left + right
+        for left, right in zip(target['histogram'], source['histogram'])
+    ]
+    merge_templates(target['templates'], source.get('templates', {}))
+    return target
+
+
+def percentile(stats, fraction):
+    """Оценка перцентиля времени ответа по гистограмме, мс."""
+    if not stats['count']:
+        return 0.0
+    threshold = stats['count'] * fraction
+    cumulative = 0
+    for index, count in enumerate(stats['histogram']):
+        cumulative += count
+        if cumulative >= threshold:
+            if index < len(HISTOGRAM_BUCKETS_MS):
+                return float(HISTOGRAM_BUCKETS_MS[index])
+            break
+    return stats['max_total_ms']
+
+
+class StatsRegistry:
+    """Агрегированная статистика процесса по именам URL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._since_dump = 0
+
+    def record(self, view_name, metrics):
+        values = metrics.as_dict()
+        with self._lock:
+            stats = self._stats.setdefault(view_name, empty_stats())
+            stats['count'] += 1
+            for metric, value in values.items():
+                stats[metric] += value
+                stats[f'max_{metric}'] = max(
+                    stats[f'max_{metric}'], value
+                )
+            stats['histogram'][bucket_index(metrics.total_ms)] += 1
+            merge_templates(stats['templates'], metrics.templates)
+            self._since_dump += 1
+            dump_due = self._since_dump >= settings.PERFORMANCE_DUMP_EVERY
+        if dump_due:
+            self.dump()
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._since_dump = 0
+
+    def dump(self, directory=None):
+        """Атомарно записывает статистику процесса в файл stats-<pid>.json."""
+        directory = directory or settings.PERFORMANCE_STATS_DIR
+        if not directory:
+            return None
+        with self._lock:
+            self._since_dump = 0
+            data = json.dumps(self._stats)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'stats-{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as stats_file:
+            stats_file.write(data)
+        os.replace(temporary, path)
+        return path
+
+
+registry = StatsRegistry()
+
+
+def load_stats(directory):
+    """Сводная статистика из файлов всех процессов."""
+    merged = {}
+    if not os.path.isdir(directory):
+        return merged
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('stats-') and name.endswith('.json')):
+            continue
+        with open(os.path.join(directory, name), encoding='utf-8') as file:
+            for view_name, stats in json.load(file).items():
+                merge_stats(merged.setdefault(view_name, empty_stats()), stats)
+    return merged
+
+
+def slowest_templates(stats, limit=5):
+    """Шаблоны URL по убыванию собственного времени на запрос.
+
+    Возвращает пары (имя, показатели) со средними на один запрос.
+    """
+    count = stats['count'] or 1
+    per_request = {
+        name: {
+            metric: value / count
+            for metric, value in template_stats.items()
+        }
+        for name, template_stats in stats.get('templates', {}).items()
+    }
+    return sorted(
+        per_request.items(),
+        key=lambda item: item[1]['self_ms'],
+        reverse=True,
+    )[:limit]
+
+
+def profiled_render(template, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return original_render(template, context)
+    metrics.enter_template()
+    started = perf_counter()
+    try:
+        return original_render(template, context)
+    finally:
+        metrics.exit_template(
+            template.name or '<string>',
+            (perf_counter() - started) * 1000,
+        )
+
+
+original_render = Template._render
+
+
+def install_template_profiler():
+    """Оборачивает Template._render, через который идут и include.
+
+    Тестовое окружение Django подменяет тот же метод, поэтому обёртка
+    ставится поверх текущего значения, а не исходного.
+    """
+    global original_render
+    if Template._render is not profiled_render:
+        original_render = Template._render
+        Template._render = profiled_render
+
+
+def check_budget(view_name, metrics):
+    """Сравнивает показатели с PERFORMANCE_BUDGETS[view_name]."""
+    budget = settings.PERFORMANCE_BUDGETS.get(view_name)
+    if not budget:
+        return
+    values = metrics.as_dict()
+    exceeded = {
+        metric: (values[metric], limit)
+        for metric, limit in budget.items()
+        if values[metric] > limit
+    }
+    if not exceeded:
+        return
+    message = f'{view_name}: превышен бюджет ' + ', '.join(
+        f'{metric}={value:g} > {limit:g}'
+        for metric, (value, limit) in exceeded.items()
+    )
+    if settings.PERFORMANCE_BUDGET_ACTION == 'raise':
+        raise PerformanceBudgetExceeded(message)
+    logger.warning(message)
+
+
+class PerformanceMiddleware:
+    """Собирает показатели запроса и проверяет бюджеты представлений."""
+
+    def __init__(self, get_response):
+        if not settings.PERFORMANCE_MONITORING:
+            raise MiddlewareNotUsed
+        if settings.PERFORMANCE_TEMPLATE_PROFILING:
+            install_template_profiler()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.execute_wrapper)
+                )
+            request.performance_metrics = metrics
+            token = current_metrics.set(metrics)
+            try:
+                response = self.get_response(request)
+            finally:
+                current_metrics.reset(token)
+        metrics.total_ms = (perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        response['Server-Timing'] = metrics.server_timing()
+        registry.record(view_name, metrics)
+        check_budget(view_name, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = request.performance_metrics
+        metrics.template_started()
+        response.add_post_render_callback(metrics.template_finished)
+        return response
@@ -0,0 +1,152 @@
+"""Чтение с реплик базы.
+
+Представления, обёрнутые в read_from_replica, читают модели приложений
+REPLICA_APPS с одной из реплик READ_REPLICAS (псевдонимов
+из DATABASES), выбранной на весь запрос. Все остальные чтения и любые
+записи идут в основную базу default. Пользователи, сессии и прочие
+модели Django всегда читаются из основной базы: только что созданная
+сессия могла ещё не дойти до реплики.
+
+Реплика отстаёт от основной базы. Чтобы автор сразу видел свою запись,
+ответ на любой POST к представлению с primary_after_write ставит
+cookie на REPLICA_STICKY_SECONDS, и пока она есть, все чтения этого
+браузера идут в основную базу. Остальные посетители в пределах
+отставания реплики могут видеть прежние данные. Ключи кэша и ETag,
+вычисляемые при чтении с реплики, строятся из данных той же реплики:
+иначе устаревший ответ закэшировался бы под новой версией.
+
+Локально реплику изображает копия файла SQLite, которую обновляет
+manage.py replicate.
+"""
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = 'read_primary'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_read_alias = ContextVar('read_alias', default=None)
+_END = object()
+
+
+def is_sticky(request):
+    """Читает ли этот браузер из основной базы после своей записи."""
+    return STICKY_COOKIE in request.COOKIES
+
+
+@contextmanager
+def reading_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def stream_from(alias, chunks):
+    """Отдаёт chunks, выполняя каждый шаг итерации с чтением из alias."""
+    chunks = iter(chunks)
+    while True:
+        with reading_from(alias):
+            chunk = next(chunks, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+def on_replica(alias, response):
+    """Отрисовка и чтение потока response тоже идут в alias."""
+    if response.streaming:
+        response.streaming_content = stream_from(
+            alias, response.streaming_content
+        )
+    elif not getattr(response, 'is_rendered', True):
+        render = response.render
+
+        def render_from_replica():
+            with reading_from(alias):
+                return render()
+
+        response.render = render_from_replica
+    return response
+
+
+async def await_on_replica(alias, coroutine):
+    with reading_from(alias):
+        response = await coroutine
+    return on_replica(alias, response)
+
+
+def read_from_replica(view):
+    """Чтения в view и при отрисовке ответа идут на случайную реплику.
+
+    TemplateResponse отрисовывается и потоковый ответ читается уже
+    после выхода из view, поэтому реплика запоминается и в ответе.
+    dispatch асинхронного представления возвращает корутину: реплика
+    выбирается на всё её выполнение. Запросы кроме GET и HEAD всегда
+    читают из основной базы.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        replicas = settings.READ_REPLICAS
+        if (
+            not replicas
+            or request.method not in SAFE_METHODS
+            or is_sticky(request)
+        ):
+            return view(request, *args, **kwargs)
+        alias = random.choice(replicas)
+        with reading_from(alias):
+            response = view(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            return await_on_replica(alias, response)
+        return on_replica(alias, response)
+
+    return wrapper
+
+
+def primary_after_write(view):
+    """После POST к view браузер на время читает из основной базы."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method == 'POST' and settings.READ_REPLICAS:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """Маршрутизатор запросов между основной базой и репликами."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        # Явный default: иначе Django прочитал бы связанные объекты
+        # из той базы, откуда загружен экземпляр-подсказка.
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.READ_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема реплик приходит с копией основной базы.
+        if db in settings.READ_REPLICAS:
+            return False
+        return None